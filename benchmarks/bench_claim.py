@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from scryer.db import Database, claim_batch_sql
+
+SKIP_LABELS = ("blocked", "wontfix")
+
+
+def make_issues(count: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": issue_id,
+            "title": f"Issue {issue_id}",
+            "url": f"https://github.com/acme/widgets/issues/{issue_id}",
+            "labels": ["enhancement", "blocked"] if issue_id % 7 == 0 else ["enhancement"],
+            "updated_at": f"2026-{1 + issue_id % 12:02d}-{1 + issue_id % 28:02d}T00:00:{issue_id % 60:02d}Z"
+            if issue_id % 10
+            else None,
+        }
+        for issue_id in range(1, count + 1)
+    ]
+
+
+def check_plan(db: Database, skip: tuple[str, ...]) -> None:
+    params = ("", "", "bench-worker", "bench", 2, *skip, 1)
+    plan = [str(row["detail"]) for row in db.conn.execute(f"EXPLAIN QUERY PLAN {claim_batch_sql(len(skip))}", params)]
+    print(f"skip_labels={','.join(skip) or '-'}")
+    print("\n".join(f"  {detail}" for detail in plan))
+    assert not any("TEMP B-TREE" in detail for detail in plan), "claim query sorts pending rows"
+    assert any("idx_issues_repo_pending_claim" in detail for detail in plan), "claim query skips the claim index"
+
+
+def run(rows: int, claims: int, batch: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "claim.db", repo_namespace="bench")
+        try:
+            db.upsert_polled_issues(make_issues(rows))
+            for skip in ((), SKIP_LABELS):
+                check_plan(db, skip)
+
+            started = time.perf_counter()
+            for _ in range(claims):
+                db.claim_next_pending("bench-worker", max_attempts=2, lease_seconds=60, skip_labels=SKIP_LABELS)
+            elapsed = time.perf_counter() - started
+            print(f"pending={rows} claims={claims} ms_per_claim={elapsed * 1000 / claims:.3f}")
+
+            transactions = max(1, claims // batch)
+            started = time.perf_counter()
+            for _ in range(transactions):
+                db.claim_pending_batch(batch, "bench-worker", max_attempts=2, lease_seconds=60)
+            elapsed = time.perf_counter() - started
+            print(
+                f"pending={rows} batch={batch} transactions={transactions} "
+                f"ms_per_transaction={elapsed * 1000 / transactions:.3f} "
+                f"ms_per_claim={elapsed * 1000 / (transactions * batch):.3f}"
+            )
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the claim query plan and time claims")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--claims", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=16)
+    args = parser.parse_args()
+    run(args.rows, args.claims, args.batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from scryer.db import Database, issue_fingerprint, utcnow_iso
+
+
+def make_issues(count: int, revision: int) -> list[dict[str, object]]:
+    return [
+        {
+            "id": issue_id,
+            "title": f"Issue {issue_id} r{revision}",
+            "body": "x" * 400,
+            "url": f"https://github.com/acme/widgets/issues/{issue_id}",
+            "labels": ["enhancement", "scryer"],
+            "updated_at": f"2026-01-{1 + revision % 28:02d}T00:00:00Z",
+        }
+        for issue_id in range(1, count + 1)
+    ]
+
+
+def row_by_row_upsert(db: Database, issues: list[dict[str, object]]) -> None:
+    now = utcnow_iso()
+    with db.conn:
+        for issue in issues:
+            title = str(issue["title"])
+            labels = [str(label) for label in issue.get("labels", [])]
+            labels_json = json.dumps(labels)
+            db.conn.execute(
+                """
+                INSERT INTO issues (
+                  repo, id, title, body, url, labels_json, status, updated_at, created_at, fingerprint
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?, ?)
+                ON CONFLICT(repo, id) DO UPDATE SET
+                  title = excluded.title,
+                  body = COALESCE(excluded.body, issues.body),
+                  url = excluded.url,
+                  labels_json = excluded.labels_json,
+                  updated_at = excluded.updated_at,
+                  fingerprint = excluded.fingerprint
+                """,
+                (
+                    db.repo_namespace,
+                    int(issue["id"]),
+                    title,
+                    issue.get("body"),
+                    issue.get("url"),
+                    labels_json,
+                    issue.get("updated_at"),
+                    now,
+                    issue_fingerprint(title, issue.get("url"), labels_json, issue.get("updated_at")),
+                ),
+            )
+            db.conn.execute(
+                "DELETE FROM issue_labels WHERE repo = ? AND issue_id = ?",
+                (db.repo_namespace, int(issue["id"])),
+            )
+            for label in labels:
+                db.conn.execute(
+                    "INSERT OR IGNORE INTO issue_labels (repo, issue_id, label) VALUES (?, ?, ?)",
+                    (db.repo_namespace, int(issue["id"]), label),
+                )
+
+
+def measure(label: str, rows: int, fn: Callable[[], object]) -> None:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} rows={rows:<7} seconds={elapsed:8.3f} rows_per_sec={rows / elapsed:12,.0f}")
+
+
+def run(rows: int, batch_size: int) -> None:
+    first = make_issues(rows, revision=1)
+    second = make_issues(rows, revision=2)
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = Database(Path(tmp) / "baseline.db", repo_namespace="bench")
+        bulk = Database(Path(tmp) / "bulk.db", repo_namespace="bench")
+        try:
+            measure("row-by-row insert", rows, lambda: row_by_row_upsert(baseline, first))
+            measure("row-by-row update", rows, lambda: row_by_row_upsert(baseline, second))
+            measure("row-by-row unchanged", rows, lambda: row_by_row_upsert(baseline, second))
+            measure("bulk insert", rows, lambda: bulk.upsert_polled_issues(first, batch_size))
+            measure("bulk update", rows, lambda: bulk.upsert_polled_issues(second, batch_size))
+            measure("bulk unchanged", rows, lambda: bulk.upsert_polled_issues(second, batch_size))
+        finally:
+            baseline.close()
+            bulk.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare row-by-row and bulk issue upserts")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.rows, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
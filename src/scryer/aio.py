@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+from pathlib import Path
+from typing import Iterable
+
+from .runner import git_failure
+
+
+async def _exec(
+    cmd: list[str],
+    cwd: Path | None,
+    semaphore: asyncio.Semaphore,
+) -> subprocess.CompletedProcess[str]:
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+    return subprocess.CompletedProcess(
+        args=cmd,
+        returncode=proc.returncode if proc.returncode is not None else -1,
+        stdout=stdout.decode("utf-8", errors="replace"),
+        stderr=stderr.decode("utf-8", errors="replace"),
+    )
+
+
+class AsyncGitExecutor:
+    def __init__(self, concurrency: int = 8):
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def git(self, args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
+        cmd = ["git", *args]
+        proc = await _exec(cmd, cwd, self._semaphore)
+        if proc.returncode != 0:
+            raise git_failure(cmd, proc.returncode, proc.stderr)
+        return proc
+
+    async def remove_worktrees(self, repo_root: Path, worktrees: Iterable[Path]) -> list[BaseException | None]:
+        results = await asyncio.gather(
+            *(
+                self.git(["worktree", "remove", "--force", str(path)], cwd=repo_root)
+                for path in worktrees
+            ),
+            return_exceptions=True,
+        )
+        return [result if isinstance(result, BaseException) else None for result in results]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import logging
+import subprocess
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+CASSETTE_MODES = {"record", "replay"}
+
+
+class CassetteError(RuntimeError):
+    pass
+
+
+@dataclass(slots=True)
+class CassetteEntry:
+    kind: str
+    argv: list[str]
+    cwd: str | None
+    stdout: str
+    stderr: str
+    exit_code: int | None
+    latency_seconds: float
+    timed_out: bool = False
+
+
+class Cassette:
+    def __init__(self, path: str | Path, mode: str, simulate_latency: bool = False):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unsupported cassette mode: {mode!r} (expected 'record' or 'replay')")
+        self.path = Path(path).expanduser()
+        self.mode = mode
+        self.simulate_latency = simulate_latency
+        self.log = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[str, ...], deque[CassetteEntry]] = defaultdict(deque)
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with self.path.open(encoding="utf-8") as handle:
+            for line_no, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = CassetteEntry(**json.loads(line))
+                except (json.JSONDecodeError, TypeError) as exc:
+                    raise CassetteError(f"Invalid cassette entry {self.path}:{line_no}: {exc}") from exc
+                self._entries[tuple(entry.argv)].append(entry)
+        self.log.info("cassette loaded path=%s commands=%s", self.path, len(self._entries))
+
+    def record(self, entry: CassetteEntry) -> None:
+        line = json.dumps(asdict(entry), sort_keys=True)
+        with self._lock, self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    def replay(self, cmd: list[str]) -> CassetteEntry:
+        with self._lock:
+            pending = self._entries.get(tuple(cmd))
+            if not pending:
+                raise CassetteError(f"No recorded response for: {' '.join(cmd)}")
+            entry = pending.popleft() if len(pending) > 1 else pending[0]
+        if self.simulate_latency and entry.latency_seconds > 0:
+            time.sleep(entry.latency_seconds)
+        return entry
+
+    def run(
+        self,
+        kind: str,
+        cmd: list[str],
+        cwd: Path | None,
+        execute: Callable[[], subprocess.CompletedProcess[str]],
+    ) -> subprocess.CompletedProcess[str]:
+        if self.replaying:
+            entry = self.replay(cmd)
+            if entry.timed_out:
+                raise subprocess.TimeoutExpired(cmd, entry.latency_seconds, entry.stdout, entry.stderr)
+            return subprocess.CompletedProcess(
+                args=cmd,
+                returncode=entry.exit_code if entry.exit_code is not None else -1,
+                stdout=entry.stdout,
+                stderr=entry.stderr,
+            )
+
+        started = time.monotonic()
+        try:
+            proc = execute()
+        except subprocess.TimeoutExpired as exc:
+            self.record(
+                CassetteEntry(
+                    kind=kind,
+                    argv=list(cmd),
+                    cwd=str(cwd) if cwd else None,
+                    stdout=_as_text(exc.stdout),
+                    stderr=_as_text(exc.stderr),
+                    exit_code=None,
+                    latency_seconds=round(time.monotonic() - started, 6),
+                    timed_out=True,
+                )
+            )
+            raise
+        self.record(
+            CassetteEntry(
+                kind=kind,
+                argv=list(cmd),
+                cwd=str(cwd) if cwd else None,
+                stdout=proc.stdout or "",
+                stderr=proc.stderr or "",
+                exit_code=proc.returncode,
+                latency_seconds=round(time.monotonic() - started, 6),
+            )
+        )
+        return proc
+
+
+def _as_text(value: str | bytes | None) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+def run_command(
+    kind: str,
+    cmd: list[str],
+    cwd: Path | None,
+    cassette: Cassette | None = None,
+) -> subprocess.CompletedProcess[str]:
+    def execute() -> subprocess.CompletedProcess[str]:
+        return subprocess.run(
+            cmd,
+            cwd=cwd,
+            text=True,
+            capture_output=True,
+            check=False,
+        )
+
+    if cassette is None:
+        return execute()
+    return cassette.run(kind, cmd, cwd, execute)
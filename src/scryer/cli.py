@@ -1,23 +1,33 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import hashlib
 import logging
 import re
 import shutil
 import subprocess
 import sys
+import threading
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 from urllib.parse import urlsplit
 
+from .aio import AsyncGitExecutor
+from .cassette import Cassette
 from .config import Config, default_config_path, load_config
 from .daemon import DaemonService
 from .db import Database
 from .doctor import print_doctor_report, run_doctor
 from .gh import GhClient
+from .gh_http import HttpGhClient
+from .multi import MultiRepoDaemon, RepoShare
+from .outbox import OutboxDrainer
 from .poller import Poller
 from .pr import PRManager
+from .resilience import ResiliencePolicy
 from .runner import CodexRunner
+from .webhook import WebhookServer, parse_listen_address
 
 
 def detect_repo_root(repo_root: str | None = None) -> Path:
@@ -62,7 +72,7 @@ def derive_repo_namespace(repo_root: Path) -> str:
     return f"{repo_name}-{digest}"
 
 
-def _namespace_from_origin(repo_root: Path) -> str | None:
+def detect_repo_slug(repo_root: Path) -> tuple[str, str, str] | None:
     proc = subprocess.run(
         ["git", "remote", "get-url", "origin"],
         cwd=repo_root,
@@ -72,7 +82,11 @@ def _namespace_from_origin(repo_root: Path) -> str | None:
     )
     if proc.returncode != 0:
         return None
-    slug = _parse_remote_slug(proc.stdout.strip())
+    return _parse_remote_slug(proc.stdout.strip())
+
+
+def _namespace_from_origin(repo_root: Path) -> str | None:
+    slug = detect_repo_slug(repo_root)
     if slug is None:
         return None
     host, owner, repo = slug
@@ -144,6 +158,24 @@ def build_parser() -> argparse.ArgumentParser:
             help="Optional path to a log file (logs are still written to stderr)",
         )
 
+    def add_cassette_args(target: argparse.ArgumentParser) -> None:
+        group = target.add_mutually_exclusive_group()
+        group.add_argument(
+            "--record-cassette",
+            metavar="PATH",
+            help="Record gh/git/codex subprocess traffic to a JSONL cassette",
+        )
+        group.add_argument(
+            "--replay-cassette",
+            metavar="PATH",
+            help="Serve gh/git/codex subprocess calls from a recorded JSONL cassette",
+        )
+        target.add_argument(
+            "--replay-latency",
+            action="store_true",
+            help="Sleep for each call's recorded latency while replaying a cassette",
+        )
+
     add_common_args(parser, with_defaults=True)
 
     sub = parser.add_subparsers(dest="command", required=True)
@@ -163,10 +195,18 @@ def build_parser() -> argparse.ArgumentParser:
         type=int,
         help="Process this GitHub issue number instead of the next pending issue",
     )
+    add_cassette_args(run_once_parser)
+    daemon_parser = sub.add_parser("daemon", help="Run the continuous daemon loop")
     add_common_args(
-        sub.add_parser("daemon", help="Run the continuous daemon loop"),
+        daemon_parser,
         with_defaults=False,
     )
+    daemon_parser.add_argument(
+        "--webhook-listen",
+        metavar="HOST:PORT",
+        help="Receive GitHub issue webhooks on HOST:PORT; polling becomes a slow reconciliation fallback",
+    )
+    add_cassette_args(daemon_parser)
     add_common_args(
         sub.add_parser("doctor", help="Run environment and integration readiness checks"),
         with_defaults=False,
@@ -181,14 +221,72 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def build_service(config_path: str, repo_root: Path) -> tuple[Database, DaemonService]:
+def build_gh_client(config: Config, repo_root: Path) -> GhClient:
+    policy = ResiliencePolicy(
+        retry_attempts=max(1, config.gh_retry_attempts),
+        max_delay_seconds=float(config.gh_retry_max_delay_seconds),
+        breaker_threshold=config.gh_breaker_threshold,
+        breaker_reset_seconds=float(config.gh_breaker_reset_seconds),
+    )
+    if config.gh_backend != "http":
+        return GhClient(repo_root, policy)
+    slug = detect_repo_slug(repo_root)
+    if slug is None:
+        raise RuntimeError(
+            f"gh_backend=http requires a GitHub 'origin' remote in {repo_root}"
+        )
+    host, owner, repo = slug
+    cache = None
+    if config.gh_http_cache:
+        cache = Database(
+            config.db_path,
+            repo_namespace=config.repo_namespace,
+            busy_timeout_seconds=config.db_busy_timeout_seconds,
+        )
+    return HttpGhClient.from_repo(
+        repo_root,
+        host=host,
+        owner=owner,
+        repo=repo,
+        api_url=config.gh_api_url,
+        pool_size=max(4, config.max_concurrent + 1),
+        cache=cache,
+        policy=policy,
+    )
+
+
+def build_cassette(args: argparse.Namespace) -> Cassette | None:
+    record_path = getattr(args, "record_cassette", None)
+    replay_path = getattr(args, "replay_cassette", None)
+    if record_path:
+        return Cassette(record_path, "record")
+    if replay_path:
+        return Cassette(replay_path, "replay", simulate_latency=getattr(args, "replay_latency", False))
+    return None
+
+
+def build_service(
+    config_path: str,
+    repo_root: Path,
+    cassette: Cassette | None = None,
+    wake_event: threading.Event | None = None,
+) -> tuple[Database, DaemonService]:
     config = load_scoped_config(config_path, repo_root)
     config.ensure_repo_directories()
-    db = Database(config.db_path, repo_namespace=config.repo_namespace)
-    gh = GhClient(repo_root)
+    if cassette is not None and config.gh_backend != "cli":
+        raise RuntimeError("cassette record/replay requires gh_backend = \"cli\"")
+    db = Database(
+        config.db_path,
+        repo_namespace=config.repo_namespace,
+        busy_timeout_seconds=config.db_busy_timeout_seconds,
+    )
+    gh = build_gh_client(config, repo_root)
+    gh.cassette = cassette
     poller = Poller(config=config, db=db, gh=gh)
     runner = CodexRunner(config=config, repo_root=repo_root)
+    runner.cassette = cassette
     pr_manager = PRManager(config=config, gh=gh)
+    outbox = OutboxDrainer(config=config, db=db, gh=gh, pr_manager=pr_manager)
     daemon = DaemonService(
         config=config,
         db=db,
@@ -196,47 +294,162 @@ def build_service(config_path: str, repo_root: Path) -> tuple[Database, DaemonSe
         poller=poller,
         runner=runner,
         pr_manager=pr_manager,
+        outbox=outbox,
+        wake_event=wake_event,
     )
     return db, daemon
 
 
+def build_multi_daemon(
+    config_path: str,
+    cassette: Cassette | None = None,
+) -> tuple[list[tuple[Database, DaemonService]], MultiRepoDaemon]:
+    config = load_config(config_path)
+    wake_event = threading.Event()
+    services: list[tuple[Database, DaemonService]] = []
+    shares: list[RepoShare] = []
+    seen: dict[str, Path] = {}
+    try:
+        for entry in config.repos:
+            repo_root = detect_repo_root(str(entry.root))
+            db, daemon = build_service(config_path, repo_root, cassette, wake_event)
+            services.append((db, daemon))
+            namespace = daemon.config.repo_namespace
+            if namespace in seen:
+                raise RuntimeError(f"repos {seen[namespace]} and {repo_root} share namespace {namespace}")
+            seen[namespace] = repo_root
+            daemon.config.worker_id = f"{daemon.config.worker_id}:{namespace}"
+            shares.append(RepoShare(service=daemon, weight=entry.weight))
+    except Exception:
+        close_services(services)
+        raise
+    return services, MultiRepoDaemon(config=config, repos=shares, wake_event=wake_event)
+
+
+def close_services(services: list[tuple[Database, DaemonService]]) -> None:
+    for db, daemon in services:
+        daemon.gh.close()
+        db.close()
+
+
 def cmd_status(config_path: str, repo_root: Path) -> int:
     db: Database | None = None
+    daemon: DaemonService | None = None
     try:
-        db, _ = build_service(config_path, repo_root)
+        db, daemon = build_service(config_path, repo_root)
         counts = db.get_status_counts()
+        cache_stats = db.get_http_cache_stats()
         if not counts:
             print(f"No issues tracked yet for repo namespace: {db.repo_namespace}")
-            return 0
-        total = sum(counts.values())
-        print(f"Repo namespace: {db.repo_namespace}")
-        print(f"Total tracked issues: {total}")
-        for status in sorted(counts):
-            print(f"{status}: {counts[status]}")
+        else:
+            total = sum(counts.values())
+            print(f"Repo namespace: {db.repo_namespace}")
+            print(f"Total tracked issues: {total}")
+            for status in sorted(counts):
+                print(f"{status}: {counts[status]}")
+            label_counts = db.get_label_status_counts(daemon.config.skip_labels)
+            for label, by_status in label_counts.items():
+                print(
+                    f"Skip label {label}: "
+                    + " ".join(f"{status}={by_status[status]}" for status in sorted(by_status))
+                )
+        today = db.get_daily_counts(date.today().isoformat())
+        print(
+            f"Today ({today.day}): done={today.done}/{daemon.config.max_issues_per_day} "
+            f"started={today.started} failed={today.failed}"
+        )
+        since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat(timespec="seconds").replace("+00:00", "Z")
+        run_stats = db.get_run_stats(since)
+        if run_stats:
+            print("Runs in the last 24h:")
+            for status, stats in run_stats.items():
+                print(
+                    f"- {status}: count={stats['count']} avg_seconds={stats['avg_seconds']:.1f} "
+                    f"max_seconds={stats['max_seconds']:.1f} cpu_seconds={stats['cpu_seconds']:.1f} "
+                    f"peak_rss_mb={stats['peak_rss_kb'] / 1024:.1f}"
+                )
+        for outbox_status in ("pending", "dead"):
+            outbox_counts = db.get_outbox_counts(outbox_status)
+            if outbox_counts:
+                print(
+                    f"Outbox {outbox_status}: "
+                    + " ".join(f"{kind}={outbox_counts[kind]}" for kind in sorted(outbox_counts))
+                )
+        if cache_stats["entries"]:
+            lookups = cache_stats["hits"] + cache_stats["misses"]
+            hit_rate = 100.0 * cache_stats["hits"] / lookups if lookups else 0.0
+            print(
+                f"HTTP cache: entries={cache_stats['entries']} hits={cache_stats['hits']} "
+                f"misses={cache_stats['misses']} hit_rate={hit_rate:.1f}%"
+            )
         return 0
     finally:
+        if daemon is not None:
+            daemon.gh.close()
         if db is not None:
             db.close()
 
 
-def cmd_run_once(config_path: str, repo_root: Path, issue_id: int | None = None) -> int:
+def cmd_run_once(
+    config_path: str,
+    repo_root: Path,
+    issue_id: int | None = None,
+    cassette: Cassette | None = None,
+) -> int:
     db: Database | None = None
+    daemon: DaemonService | None = None
     try:
-        db, daemon = build_service(config_path, repo_root)
+        db, daemon = build_service(config_path, repo_root, cassette)
         daemon.run_once(issue_id=issue_id)
         return 0
     finally:
+        if daemon is not None:
+            daemon.gh.close()
         if db is not None:
             db.close()
 
 
-def cmd_daemon(config_path: str, repo_root: Path) -> int:
+def cmd_daemon(
+    config_path: str,
+    repo_root: Path,
+    webhook_listen: str | None = None,
+    cassette: Cassette | None = None,
+) -> int:
+    if load_config(config_path).repos:
+        if webhook_listen:
+            raise RuntimeError("--webhook-listen is not supported when the config lists repos")
+        services, multi = build_multi_daemon(config_path, cassette)
+        try:
+            multi.run_forever()
+            return 0
+        finally:
+            close_services(services)
+
     db: Database | None = None
+    daemon: DaemonService | None = None
+    webhook: WebhookServer | None = None
     try:
-        db, daemon = build_service(config_path, repo_root)
+        db, daemon = build_service(config_path, repo_root, cassette)
+        if webhook_listen:
+            host, port = parse_listen_address(webhook_listen)
+            slug = detect_repo_slug(repo_root)
+            webhook = WebhookServer(
+                config=daemon.config,
+                host=host,
+                port=port,
+                secret=daemon.config.webhook_secret or "",
+                on_change=daemon.wake,
+                repo_full_name=f"{slug[1]}/{slug[2]}" if slug else None,
+            )
+            webhook.start()
+            daemon.reconcile_interval_seconds = daemon.config.webhook_reconcile_seconds
         daemon.run_forever()
         return 0
     finally:
+        if webhook is not None:
+            webhook.stop()
+        if daemon is not None:
+            daemon.gh.close()
         if db is not None:
             db.close()
 
@@ -275,18 +488,6 @@ def _list_git_worktrees(repo_root: Path) -> list[Path]:
     return worktrees
 
 
-def _git_worktree_remove(repo_root: Path, worktree_path: Path) -> None:
-    proc = subprocess.run(
-        ["git", "worktree", "remove", "--force", str(worktree_path)],
-        cwd=repo_root,
-        text=True,
-        capture_output=True,
-        check=False,
-    )
-    if proc.returncode != 0:
-        raise RuntimeError(proc.stderr.strip() or f"failed to remove worktree: {worktree_path}")
-
-
 def _git_worktree_prune(repo_root: Path) -> None:
     proc = subprocess.run(
         ["git", "worktree", "prune"],
@@ -315,14 +516,18 @@ def cmd_clean(config_path: str, repo_root: Path) -> int:
     managed_runs = config.runs_dir.resolve()
     db_path = config.db_path.resolve()
 
-    removed_worktrees = 0
-    for path in _list_git_worktrees(repo_root):
-        if path == repo_root:
-            continue
-        if not _path_within(path, managed_worktrees):
-            continue
-        _git_worktree_remove(repo_root, path)
-        removed_worktrees += 1
+    targets = [
+        path
+        for path in _list_git_worktrees(repo_root)
+        if path != repo_root and _path_within(path, managed_worktrees)
+    ]
+    errors = asyncio.run(
+        AsyncGitExecutor(config.async_concurrency).remove_worktrees(repo_root, targets)
+    )
+    for error in errors:
+        if error is not None:
+            raise RuntimeError(f"failed to remove worktree: {error}") from error
+    removed_worktrees = len(targets)
     _git_worktree_prune(repo_root)
 
     _remove_path(managed_worktrees)
@@ -333,8 +538,19 @@ def cmd_clean(config_path: str, repo_root: Path) -> int:
 
     if db_path.exists() and db_path.is_dir():
         raise RuntimeError(f"Refusing to use directory db_path: {db_path}")
-    db = Database(db_path, repo_namespace=config.repo_namespace)
-    cleared_issues, cleared_meta = db.clear_namespace_state()
+    db = Database(
+        db_path,
+        repo_namespace=config.repo_namespace,
+        busy_timeout_seconds=config.db_busy_timeout_seconds,
+    )
+    (
+        cleared_issues,
+        cleared_meta,
+        cleared_cache,
+        cleared_outbox,
+        cleared_runs,
+        cleared_counters,
+    ) = db.clear_namespace_state()
     db.close()
 
     print("Reset complete:")
@@ -342,7 +558,11 @@ def cmd_clean(config_path: str, repo_root: Path) -> int:
     print(f"- removed git worktrees: {removed_worktrees}")
     print(f"- reset worktrees dir: {managed_worktrees}")
     print(f"- reset runs dir: {managed_runs}")
-    print(f"- cleared db rows: issues={cleared_issues} meta={cleared_meta}")
+    print(
+        f"- cleared db rows: issues={cleared_issues} meta={cleared_meta} "
+        f"http_cache={cleared_cache} outbox={cleared_outbox} runs={cleared_runs} "
+        f"daily_counters={cleared_counters}"
+    )
     print(f"- db file: {db_path}")
     return 0
 
@@ -370,9 +590,19 @@ def main(argv: list[str] | None = None) -> int:
         if args.command == "status":
             return cmd_status(args.config, repo_root)
         if args.command == "run-once":
-            return cmd_run_once(args.config, repo_root, getattr(args, "issue_id", None))
+            return cmd_run_once(
+                args.config,
+                repo_root,
+                getattr(args, "issue_id", None),
+                build_cassette(args),
+            )
         if args.command == "daemon":
-            return cmd_daemon(args.config, repo_root)
+            return cmd_daemon(
+                args.config,
+                repo_root,
+                getattr(args, "webhook_listen", None),
+                build_cassette(args),
+            )
         if args.command == "doctor":
             return cmd_doctor(args.config, repo_root)
         if args.command == "clean":
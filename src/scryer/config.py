@@ -35,6 +35,12 @@ def default_config_path() -> Path:
     return (base / "scryer" / "config.toml").resolve()
 
 
+@dataclass(slots=True)
+class RepoEntry:
+    root: Path
+    weight: int = 1
+
+
 @dataclass(slots=True)
 class Config:
     workdir: Path
@@ -43,8 +49,13 @@ class Config:
     trigger_label: str = "enhancement"
     base_branch: str = "main"
     poll_interval_seconds: int = 60
+    poll_full_resync_seconds: int = 3600
+    adaptive_poll_interval: bool = True
+    min_poll_interval_seconds: int | None = None
+    max_poll_interval_seconds: int = 900
     codex_timeout_seconds: int = 900
     max_concurrent: int = 1
+    async_concurrency: int = 8
     lease_seconds: int = 2400
     max_attempts: int = 2
     branch_prefix: str = "codex"
@@ -55,6 +66,7 @@ class Config:
     codex_model: str | None = None
     codex_cost_guard: str | None = None
     max_issues_per_day: int = 10
+    issue_details_max_staleness_seconds: int = 300
     skip_labels: list[str] = field(default_factory=lambda: ["wontfix", "blocked"])
     conventions_files: list[str] = field(
         default_factory=lambda: ["AGENTS.md", "CONTRIBUTING.md", "README.md"]
@@ -62,6 +74,19 @@ class Config:
     keep_worktree_on_failure: bool = False
     draft_pr: bool = True
     issue_comment_on_success: bool = False
+    gh_backend: str = "cli"
+    gh_api_url: str | None = None
+    gh_http_cache: bool = True
+    gh_retry_attempts: int = 3
+    gh_retry_max_delay_seconds: int = 30
+    gh_breaker_threshold: int = 5
+    gh_breaker_reset_seconds: int = 60
+    outbox_max_backoff_seconds: int = 900
+    outbox_max_attempts: int = 8
+    db_busy_timeout_seconds: int = 5
+    webhook_secret: str | None = None
+    webhook_reconcile_seconds: int = 900
+    repos: list[RepoEntry] = field(default_factory=list)
     worker_id: str = field(default_factory=lambda: f"{socket.gethostname()}-{os.getpid()}")
 
     def ensure_directories(self) -> None:
@@ -74,6 +99,12 @@ class Config:
         self.runs_dir.mkdir(parents=True, exist_ok=True)
         self.worktrees_dir.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def effective_min_poll_interval_seconds(self) -> int:
+        if self.min_poll_interval_seconds is None:
+            return self.poll_interval_seconds
+        return self.min_poll_interval_seconds
+
     @property
     def runs_dir(self) -> Path:
         return self.workdir / "runs" / self.repo_namespace
@@ -125,6 +156,15 @@ def load_config(config_path: str | Path | None = None) -> Config:
             return default
         return int(val)
 
+    def optional_int_value(key: str) -> int | None:
+        env = _coalesce_env(key.upper())
+        if env is not None:
+            return int(env) if env.strip() else None
+        val = raw.get(key)
+        if val is None:
+            return None
+        return int(val)
+
     def str_value(key: str, default: str) -> str:
         env = _coalesce_env(key.upper())
         if env is not None:
@@ -164,14 +204,40 @@ def load_config(config_path: str | Path | None = None) -> Config:
             return val
         return _parse_bool(str(val))
 
+    def repos_value() -> list[RepoEntry]:
+        env = _coalesce_env("REPOS")
+        val: object = _parse_list(env) if env is not None else raw.get("repos", [])
+        if not isinstance(val, list):
+            raise ValueError("repos must be a list of paths or {root, weight} tables")
+        entries: list[RepoEntry] = []
+        for item in val:
+            if isinstance(item, dict):
+                root_raw, weight = item.get("root"), int(item.get("weight", 1))
+            else:
+                root_raw, weight = item, 1
+            if not root_raw:
+                raise ValueError("repos entries require a root path")
+            if weight < 1:
+                raise ValueError(f"repos weight must be >= 1, got {weight} for {root_raw}")
+            root = Path(str(root_raw)).expanduser()
+            if not root.is_absolute():
+                root = (config_dir / root).resolve()
+            entries.append(RepoEntry(root=root, weight=weight))
+        return entries
+
     cfg = Config(
         workdir=workdir,
         db_path=db_path,
         trigger_label=str_value("trigger_label", "enhancement"),
         base_branch=str_value("base_branch", "main"),
         poll_interval_seconds=int_value("poll_interval_seconds", 60),
+        poll_full_resync_seconds=int_value("poll_full_resync_seconds", 3600),
+        adaptive_poll_interval=bool_value("adaptive_poll_interval", True),
+        min_poll_interval_seconds=optional_int_value("min_poll_interval_seconds"),
+        max_poll_interval_seconds=int_value("max_poll_interval_seconds", 900),
         codex_timeout_seconds=int_value("codex_timeout_seconds", 900),
         max_concurrent=int_value("max_concurrent", 1),
+        async_concurrency=int_value("async_concurrency", 8),
         lease_seconds=int_value("lease_seconds", 2400),
         max_attempts=int_value("max_attempts", 2),
         branch_prefix=str_value("branch_prefix", "codex"),
@@ -182,6 +248,7 @@ def load_config(config_path: str | Path | None = None) -> Config:
         codex_model=optional_str_value("codex_model"),
         codex_cost_guard=optional_str_value("codex_cost_guard"),
         max_issues_per_day=int_value("max_issues_per_day", 10),
+        issue_details_max_staleness_seconds=int_value("issue_details_max_staleness_seconds", 300),
         skip_labels=list_value("skip_labels", ["wontfix", "blocked"]),
         conventions_files=list_value(
             "conventions_files", ["AGENTS.md", "CONTRIBUTING.md", "README.md"]
@@ -189,6 +256,21 @@ def load_config(config_path: str | Path | None = None) -> Config:
         keep_worktree_on_failure=bool_value("keep_worktree_on_failure", False),
         draft_pr=bool_value("draft_pr", True),
         issue_comment_on_success=bool_value("issue_comment_on_success", False),
+        gh_backend=str_value("gh_backend", "cli").strip().lower(),
+        gh_api_url=optional_str_value("gh_api_url"),
+        gh_http_cache=bool_value("gh_http_cache", True),
+        gh_retry_attempts=int_value("gh_retry_attempts", 3),
+        gh_retry_max_delay_seconds=int_value("gh_retry_max_delay_seconds", 30),
+        gh_breaker_threshold=int_value("gh_breaker_threshold", 5),
+        gh_breaker_reset_seconds=int_value("gh_breaker_reset_seconds", 60),
+        outbox_max_backoff_seconds=int_value("outbox_max_backoff_seconds", 900),
+        outbox_max_attempts=int_value("outbox_max_attempts", 8),
+        db_busy_timeout_seconds=int_value("db_busy_timeout_seconds", 5),
+        webhook_secret=optional_str_value("webhook_secret"),
+        webhook_reconcile_seconds=int_value("webhook_reconcile_seconds", 900),
+        repos=repos_value(),
     )
+    if cfg.gh_backend not in {"cli", "http"}:
+        raise ValueError(f"Unsupported gh_backend: {cfg.gh_backend!r} (expected 'cli' or 'http')")
     cfg.ensure_directories()
     return cfg
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import logging
 import signal
+import threading
 import time
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, datetime, timezone
 
 from .config import Config
 from .db import Database
 from .gh import GhClient, GhError
-from .models import IssueRecord
+from .models import IssueRecord, RunnerResult
+from .outbox import OutboxDrainer
 from .poller import Poller
 from .pr import PRManager
+from .ratelimit import plan_poll_interval
 from .runner import CodexRunner
 
+_CALLS_EWMA_ALPHA = 0.3
+
 
 @dataclass(slots=True)
 class CycleResult:
@@ -31,6 +36,8 @@ class DaemonService:
         poller: Poller,
         runner: CodexRunner,
         pr_manager: PRManager,
+        outbox: OutboxDrainer,
+        wake_event: threading.Event | None = None,
     ):
         self.config = config
         self.db = db
@@ -38,22 +45,51 @@ class DaemonService:
         self.poller = poller
         self.runner = runner
         self.pr_manager = pr_manager
+        self.outbox = outbox
         self.log = logging.getLogger(__name__)
         self._stop_requested = False
+        self._calls_per_cycle: float | None = None
+        self._wake = wake_event or threading.Event()
+        self._poll_wake = threading.Event()
+        self._outbox_wake = threading.Event()
+        self._consecutive_failures = 0
+        self._paused_until = 0.0
+        self._cancel_events: dict[int, threading.Event] = {}
+        self._cancel_lock = threading.Lock()
+        self._poll_requested = False
+        self._last_poll_at: float | None = None
+        self.reconcile_interval_seconds: int | None = None
 
     def install_signal_handlers(self) -> None:
         def _handler(signum: int, _frame) -> None:
             self.log.info("signal received signum=%s stop_requested=true", signum)
-            self._stop_requested = True
+            self.request_stop()
 
         signal.signal(signal.SIGINT, _handler)
         signal.signal(signal.SIGTERM, _handler)
 
+    def request_stop(self) -> None:
+        self._stop_requested = True
+        self._poll_wake.set()
+        self._outbox_wake.set()
+        self._wake.set()
+
+    def wake(self, full_poll: bool = False) -> None:
+        if full_poll:
+            self._poll_requested = True
+            self._poll_wake.set()
+        self._wake.set()
+
+    def _poll_due(self) -> bool:
+        if self.reconcile_interval_seconds is None or self._last_poll_at is None:
+            return True
+        if self._poll_requested:
+            return True
+        return time.monotonic() - self._last_poll_at >= self.reconcile_interval_seconds
+
     def run_forever(self) -> None:
         self.install_signal_handlers()
-        gh_backoff = self.config.poll_interval_seconds
-        consecutive_failures = 0
-        cycle = 0
+        workers = max(1, self.config.max_concurrent)
         self.log.info(
             "daemon started worker=%s repo_namespace=%s poll_interval_seconds=%s lease_seconds=%s max_attempts=%s max_concurrent=%s",
             self.config.worker_id,
@@ -63,76 +99,259 @@ class DaemonService:
             self.config.max_attempts,
             self.config.max_concurrent,
         )
+        poll_thread = threading.Thread(target=self.poll_loop, name="scryer-poller", daemon=True)
+        poll_thread.start()
+        outbox_thread = threading.Thread(target=self.outbox_loop, name="scryer-outbox", daemon=True)
+        outbox_thread.start()
+
+        inflight: dict[Future[CycleResult], IssueRecord] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scryer-worker") as executor:
+            while not self._stop_requested:
+                for future in [future for future in inflight if future.done()]:
+                    self.collect_result(future, inflight.pop(future))
+
+                wait_seconds = float(self.config.poll_interval_seconds)
+                paused_for = self.dispatch_paused_for()
+                if paused_for > 0:
+                    wait_seconds = min(wait_seconds, paused_for)
+                else:
+                    try:
+                        self._dispatch(executor, inflight, workers)
+                    except Exception:
+                        self.log.exception("unexpected dispatch error")
+                self._wait_for_wake(wait_seconds)
+            if inflight:
+                self.log.info("waiting for in-flight workers count=%s", len(inflight))
+
+        for future, issue in inflight.items():
+            self.collect_result(future, issue)
+        self._poll_wake.set()
+        self._outbox_wake.set()
+        poll_thread.join(timeout=30)
+        outbox_thread.join(timeout=30)
+        self.db.remove_daemon_heartbeat(self.config.worker_id)
+        self.log.info("daemon stopped")
 
-        while not self._stop_requested:
-            cycle += 1
-            cycle_started = time.monotonic()
-            sleep_seconds = self.config.poll_interval_seconds
-            try:
-                result = self.run_once()
-                gh_backoff = self.config.poll_interval_seconds
-            except GhError as exc:
-                wait_seconds = min(gh_backoff, 300)
-                self.log.error(
-                    "github operation failed cycle=%s backoff_seconds=%s error=%s",
-                    cycle,
-                    wait_seconds,
-                    exc,
-                )
-                gh_backoff = min(gh_backoff * 2, 300)
-                sleep_seconds = wait_seconds
-                self.log.info("cycle sleep cycle=%s sleep_seconds=%s", cycle, sleep_seconds)
-                self._sleep_interruptible(sleep_seconds)
-                continue
-            except Exception:
-                self.log.exception("unexpected daemon loop error cycle=%s", cycle)
-                sleep_seconds = self.config.poll_interval_seconds
-                self.log.info("cycle sleep cycle=%s sleep_seconds=%s", cycle, sleep_seconds)
-                self._sleep_interruptible(sleep_seconds)
-                continue
-
-            elapsed_seconds = int(time.monotonic() - cycle_started)
+    def _dispatch(
+        self,
+        executor: ThreadPoolExecutor,
+        inflight: dict[Future[CycleResult], IssueRecord],
+        workers: int,
+    ) -> None:
+        started = time.monotonic()
+        self.prepare_dispatch()
+        submitted = self.submit_claims(executor, workers - len(inflight), len(inflight))
+        inflight.update(submitted)
+        if submitted:
             self.log.info(
-                "cycle complete cycle=%s processed=%s status=%s elapsed_seconds=%s",
-                cycle,
-                result.processed,
-                result.status,
-                elapsed_seconds,
+                "dispatched issues count=%s inflight=%s dispatch_latency_ms=%s issue_ids=%s",
+                len(submitted),
+                len(inflight),
+                int((time.monotonic() - started) * 1000),
+                ",".join(str(issue.id) for issue in submitted.values()),
             )
 
-            if result.status in {"failed", "timeout"}:
-                consecutive_failures += 1
-            elif result.processed:
-                consecutive_failures = 0
+    def prepare_dispatch(self) -> None:
+        self._signal_cancelled(self.db)
+        expired = self.db.requeue_expired_leases()
+        if expired:
+            self.log.info("requeued expired leases count=%s", expired)
+
+    def submit_claims(
+        self,
+        executor: ThreadPoolExecutor,
+        limit: int,
+        inflight_count: int,
+    ) -> dict[Future[CycleResult], IssueRecord]:
+        if limit <= 0:
+            return {}
+        claim_limit = min(limit, self._daily_remaining_capacity() - inflight_count)
+        if claim_limit <= 0:
+            self.log.warning("daily issue limit reached limit=%s", self.config.max_issues_per_day)
+            return {}
+        issues = self._claim_pending_batch(claim_limit)
+        if not issues:
+            return {}
+        submitted: dict[Future[CycleResult], IssueRecord] = {}
+        for issue in issues:
+            cancel = threading.Event()
+            with self._cancel_lock:
+                self._cancel_events[issue.id] = cancel
+            # Uncached details are fetched by the worker so GitHub never blocks dispatch.
+            cached = self._cached_issue_details(issue)
+            future = executor.submit(
+                self._handle_issue,
+                issue,
+                self.db,
+                cached,
+                cached is not None,
+                cancel,
+            )
+            future.add_done_callback(lambda _future: self._wake.set())
+            submitted[future] = issue
+        return submitted
 
-            if consecutive_failures >= 3:
+    def collect_result(self, future: Future[CycleResult], issue: IssueRecord) -> CycleResult:
+        with self._cancel_lock:
+            self._cancel_events.pop(issue.id, None)
+        try:
+            result = future.result()
+        except Exception:
+            self.log.exception("worker failed unexpectedly id=%s", issue.id)
+            result = CycleResult(processed=True, status="failed")
+        self.log.info(
+            "worker finished repo_namespace=%s id=%s status=%s",
+            self.config.repo_namespace,
+            issue.id,
+            result.status,
+        )
+        if result.status in {"failed", "timeout"}:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= 3:
                 extra_delay = min(self.config.poll_interval_seconds * 3, 300)
                 self.log.warning(
-                    "consecutive failures threshold reached cycle=%s count=%s wait_seconds=%s",
-                    cycle,
-                    consecutive_failures,
+                    "consecutive failures threshold reached repo_namespace=%s count=%s wait_seconds=%s",
+                    self.config.repo_namespace,
+                    self._consecutive_failures,
                     extra_delay,
                 )
-                sleep_seconds = extra_delay
-            else:
-                sleep_seconds = self.config.poll_interval_seconds
-            self.log.info("cycle sleep cycle=%s sleep_seconds=%s", cycle, sleep_seconds)
-            self._sleep_interruptible(sleep_seconds)
-        self.log.info("daemon stopped")
+                self._paused_until = time.monotonic() + extra_delay
+        elif result.processed:
+            self._consecutive_failures = 0
+        return result
+
+    def dispatch_paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def _signal_cancelled(self, db: Database) -> None:
+        with self._cancel_lock:
+            pending = {issue_id: event for issue_id, event in self._cancel_events.items() if not event.is_set()}
+        if not pending:
+            return
+        statuses = db.get_issue_statuses(pending)
+        for issue_id, event in pending.items():
+            if statuses.get(issue_id) == "cancelled":
+                event.set()
+                self.log.info("signalled worker to stop id=%s", issue_id)
+
+    def poll_loop(self) -> None:
+        cycle = 0
+        calls_before = self.gh.rate_limit.calls
+        while not self._stop_requested:
+            cycle += 1
+            sleep_seconds = self.config.poll_interval_seconds
+            try:
+                if self._poll_due():
+                    self._poll_once(self.poller)
+                    self._signal_cancelled(self.db)
+                calls = self.gh.rate_limit.calls
+                self._observe_cycle_calls(calls - calls_before)
+                calls_before = calls
+                sleep_seconds = self._plan_poll_interval(cycle, self.db)
+            except Exception:
+                self.log.exception("unexpected poll loop error cycle=%s", cycle)
+            if self.reconcile_interval_seconds is not None:
+                sleep_seconds = max(sleep_seconds, self.reconcile_interval_seconds)
+            self.log.info("poll sleep cycle=%s sleep_seconds=%s", cycle, sleep_seconds)
+            if self._poll_wake.wait(timeout=sleep_seconds):
+                self._poll_wake.clear()
+
+    def outbox_loop(self) -> None:
+        while not self._stop_requested:
+            try:
+                self.pr_manager.begin_cycle()
+                self.outbox.drain()
+            except Exception:
+                self.log.exception("unexpected outbox drain error")
+            if self._outbox_wake.wait(timeout=self.config.poll_interval_seconds):
+                self._outbox_wake.clear()
 
-    def run_once(self, issue_id: int | None = None) -> CycleResult:
-        polled = self.poller.poll_and_upsert()
-        self.log.info("poll sync complete fetched=%s", polled)
+    def _poll_once(self, poller: Poller) -> None:
+        self._poll_requested = False
+        started = time.monotonic()
+        try:
+            fetched = poller.poll_and_upsert()
+        except GhError as exc:
+            self.log.warning(
+                "poll failed poll_latency_ms=%s error=%s",
+                int((time.monotonic() - started) * 1000),
+                exc,
+            )
+            return
+        self._last_poll_at = time.monotonic()
+        self.log.info(
+            "poll sync complete fetched=%s poll_latency_ms=%s",
+            fetched,
+            int((self._last_poll_at - started) * 1000),
+        )
+        if fetched:
+            self._wake.set()
+
+    def _observe_cycle_calls(self, calls: int) -> None:
+        if self._calls_per_cycle is None:
+            self._calls_per_cycle = float(calls)
+            return
+        self._calls_per_cycle += _CALLS_EWMA_ALPHA * (calls - self._calls_per_cycle)
+
+    def _plan_poll_interval(self, cycle: int, db: Database) -> int:
+        if not self.config.adaptive_poll_interval:
+            return self.config.poll_interval_seconds
+        min_interval = self.config.effective_min_poll_interval_seconds
+        max_interval = max(min_interval, self.config.max_poll_interval_seconds)
+        try:
+            self.gh.refresh_rate_limit()
+        except GhError as exc:
+            self.log.warning("rate limit refresh failed cycle=%s error=%s", cycle, exc)
+            return self.config.poll_interval_seconds
+
+        db.record_daemon_heartbeat(self.config.worker_id)
+        peers = db.count_active_daemons(within_seconds=max(2 * max_interval, 300))
+        calls_per_cycle = self._calls_per_cycle or 1.0
+        plan = plan_poll_interval(
+            self.gh.rate_limit.snapshots(self.gh.rate_limit_resources),
+            calls_per_cycle=calls_per_cycle,
+            peers=peers,
+            min_interval=min_interval,
+            max_interval=max_interval,
+        )
+        if plan.resource is None:
+            return self.config.poll_interval_seconds
+        self.log.info(
+            "poll interval planned cycle=%s interval_seconds=%s resource=%s remaining=%s reset_in_seconds=%s calls_per_cycle=%.1f peers=%s",
+            cycle,
+            plan.interval_seconds,
+            plan.resource,
+            plan.remaining,
+            plan.reset_in_seconds,
+            calls_per_cycle,
+            peers,
+        )
+        return plan.interval_seconds
+
+    def run_once(self, issue_id: int | None = None, poll: bool = True) -> CycleResult:
+        self.pr_manager.begin_cycle()
+        if poll:
+            self._poll_requested = False
+            try:
+                polled = self.poller.poll_and_upsert()
+            except GhError as exc:
+                self.log.warning("poll failed; continuing with queued issues error=%s", exc)
+            else:
+                self._last_poll_at = time.monotonic()
+                self.log.info("poll sync complete fetched=%s", polled)
         expired = self.db.requeue_expired_leases()
         if expired:
             self.log.info("requeued expired leases count=%s", expired)
+        self.outbox.drain()
 
         if issue_id is not None:
             issue = self._claim_target_issue(issue_id)
             if issue is None:
                 self.log.info("requested issue is not pending id=%s", issue_id)
                 return CycleResult(processed=False, status=None)
-            return self._handle_issue(issue, self.db)
+            result = self._handle_issue(issue, self.db)
+            self.outbox.drain()
+            return result
 
         claim_limit = self._claim_limit_for_cycle()
         if claim_limit <= 0:
@@ -149,7 +368,9 @@ class DaemonService:
             self.config.max_concurrent,
             ",".join(str(issue.id) for issue in issues),
         )
-        return self._process_claimed_issues(issues)
+        result = self._process_claimed_issues(issues)
+        self.outbox.drain()
+        return result
 
     def _claim_limit_for_cycle(self) -> int:
         daily_remaining = self._daily_remaining_capacity()
@@ -158,30 +379,36 @@ class DaemonService:
         return min(max(1, self.config.max_concurrent), daily_remaining)
 
     def _daily_remaining_capacity(self) -> int:
-        today = date.today().isoformat()
-        done_count = self.db.get_daily_done_count(today)
-        return max(self.config.max_issues_per_day - done_count, 0)
+        counts = self.db.get_daily_counts(date.today().isoformat())
+        return max(self.config.max_issues_per_day - counts.done, 0)
 
     def _claim_pending_batch(self, claim_limit: int) -> list[IssueRecord]:
-        claimed: list[IssueRecord] = []
-        for _ in range(claim_limit):
-            issue = self.db.claim_next_pending(
-                worker_id=self.config.worker_id,
-                max_attempts=self.config.max_attempts,
-                lease_seconds=self.config.lease_seconds,
-            )
-            if issue is None:
-                break
-            claimed.append(issue)
-        return claimed
+        return self.db.claim_pending_batch(
+            claim_limit,
+            worker_id=self.config.worker_id,
+            max_attempts=self.config.max_attempts,
+            lease_seconds=self.config.lease_seconds,
+            skip_labels=self.config.skip_labels,
+        )
 
     def _process_claimed_issues(self, issues: list[IssueRecord]) -> CycleResult:
+        details, cached_ids = self._prefetch_issue_details(issues)
         if len(issues) == 1:
-            return self._handle_issue(issues[0], self.db)
+            issue = issues[0]
+            return self._handle_issue(issue, self.db, details.get(issue.id), issue.id in cached_ids)
 
         results: list[CycleResult] = []
         with ThreadPoolExecutor(max_workers=len(issues), thread_name_prefix="scryer-worker") as executor:
-            futures = [executor.submit(self._handle_issue_with_worker_db, issue) for issue in issues]
+            futures = [
+                executor.submit(
+                    self._handle_issue,
+                    issue,
+                    self.db,
+                    details.get(issue.id),
+                    issue.id in cached_ids,
+                )
+                for issue in issues
+            ]
             for future in as_completed(futures):
                 try:
                     results.append(future.result())
@@ -195,12 +422,53 @@ class DaemonService:
             status=self._aggregate_status(statuses),
         )
 
-    def _handle_issue_with_worker_db(self, issue: IssueRecord) -> CycleResult:
-        worker_db = Database(self.config.db_path, repo_namespace=self.config.repo_namespace)
+    def _prefetch_issue_details(
+        self,
+        issues: list[IssueRecord],
+    ) -> tuple[dict[int, dict[str, object]], set[int]]:
+        details: dict[int, dict[str, object]] = {}
+        for issue in issues:
+            cached = self._cached_issue_details(issue)
+            if cached is not None:
+                details[issue.id] = cached
+        cached_ids = set(details)
+        stale = [issue.id for issue in issues if issue.id not in cached_ids]
+        if stale:
+            try:
+                details.update(self.gh.view_issues(stale))
+            except GhError as exc:
+                self.log.warning("batched issue fetch failed count=%s error=%s", len(stale), exc)
+        self.log.info(
+            "prefetched issue details requested=%s cached=%s fetched=%s",
+            len(issues),
+            len(cached_ids),
+            len(details) - len(cached_ids),
+        )
+        return details, cached_ids
+
+    def _cached_issue_details(self, issue: IssueRecord) -> dict[str, object] | None:
+        max_staleness = self.config.issue_details_max_staleness_seconds
+        if max_staleness <= 0 or issue.body is None or not issue.updated_at:
+            return None
+        if issue.details_updated_at != issue.updated_at or not issue.details_fetched_at:
+            return None
+        if not issue.details_state:
+            return None
         try:
-            return self._handle_issue(issue, worker_db)
-        finally:
-            worker_db.close()
+            fetched_at = datetime.fromisoformat(issue.details_fetched_at)
+        except ValueError:
+            return None
+        if (datetime.now(timezone.utc) - fetched_at).total_seconds() > max_staleness:
+            return None
+        return {
+            "number": issue.id,
+            "title": issue.title,
+            "body": issue.body,
+            "url": issue.url,
+            "labels": [{"name": label} for label in issue.labels],
+            "state": issue.details_state,
+            "updatedAt": issue.updated_at,
+        }
 
     @staticmethod
     def _aggregate_status(statuses: list[str]) -> str | None:
@@ -251,22 +519,35 @@ class DaemonService:
             lease_seconds=self.config.lease_seconds,
         )
 
-    def _handle_issue(self, issue: IssueRecord, db: Database) -> CycleResult:
+    def _handle_issue(
+        self,
+        issue: IssueRecord,
+        db: Database,
+        full: dict[str, object] | None = None,
+        cached: bool = False,
+        cancel: threading.Event | None = None,
+    ) -> CycleResult:
         self.log.info("claimed issue id=%s attempt=%s", issue.id, issue.attempt_count)
         run_dir: str | None = None
         try:
-            full = self.gh.view_issue(issue.id)
+            if full is None:
+                full = self.gh.view_issue(issue.id)
+                cached = False
             label_names = self._label_names(full)
-            db.update_issue_details(
-                {
-                    "id": int(full["number"]),
-                    "title": str(full.get("title", "")),
-                    "body": full.get("body"),
-                    "url": full.get("url"),
-                    "labels": label_names,
-                    "updated_at": full.get("updatedAt"),
-                }
-            )
+            if cached:
+                self.log.info("using cached issue details id=%s updated_at=%s", issue.id, issue.updated_at)
+            else:
+                db.update_issue_details(
+                    {
+                        "id": int(full["number"]),
+                        "title": str(full.get("title", "")),
+                        "body": full.get("body"),
+                        "url": full.get("url"),
+                        "labels": label_names,
+                        "updated_at": full.get("updatedAt"),
+                        "state": full.get("state"),
+                    }
+                )
 
             if str(full.get("state", "")).lower() != "open":
                 reason = "issue is no longer open"
@@ -287,8 +568,10 @@ class DaemonService:
                 self.log.info("issue skipped id=%s reason=%s", issue.id, reason)
                 return CycleResult(processed=True, status="skipped")
 
-            result = self.runner.run(full)
+            self._increment_daily_count(db, started=1)
+            result = self.runner.run(full, cancel)
             run_dir = str(result.run_dir)
+            self._record_run(db, issue, result)
             self.log.info(
                 "runner result id=%s status=%s branch=%s run_dir=%s",
                 issue.id,
@@ -296,18 +579,24 @@ class DaemonService:
                 result.branch,
                 run_dir,
             )
+            if result.status == "cancelled":
+                self.log.info("run cancelled; worker slot reclaimed id=%s run_dir=%s", issue.id, run_dir)
+                return CycleResult(processed=True, status="cancelled")
+
             if result.status == "pushed":
-                pr = self.pr_manager.ensure_pr(full, result)
-                db.mark_done(
+                pushed = db.mark_pushed(
                     issue_id=issue.id,
-                    pr_number=pr.number,
-                    pr_url=pr.url,
                     branch=result.branch,
                     head_sha=result.head_sha,
                     run_dir=run_dir,
+                    pr_job=self.pr_manager.pr_job(full, result),
                 )
-                self._increment_daily_count(db)
-                self.log.info("issue complete id=%s pr=%s", issue.id, pr.url)
+                if not pushed:
+                    self.log.info("issue cancelled after push; pr not queued id=%s", issue.id)
+                    return CycleResult(processed=True, status="cancelled")
+                self._increment_daily_count(db, done=1)
+                self._outbox_wake.set()
+                self.log.info("issue pushed id=%s branch=%s pr_queued=true", issue.id, result.branch)
                 return CycleResult(processed=True, status="done")
 
             if result.status == "skipped":
@@ -316,21 +605,47 @@ class DaemonService:
                 return CycleResult(processed=True, status="skipped")
 
             if result.status == "timeout":
-                db.mark_timeout(issue.id, result.error or "runner timeout", run_dir)
+                if db.mark_timeout(issue.id, result.error or "runner timeout", run_dir):
+                    self._increment_daily_count(db, failed=1)
                 self.log.warning("issue timed out id=%s", issue.id)
                 return CycleResult(processed=True, status="timeout")
 
-            db.mark_failed(issue.id, result.error or "runner failed", run_dir)
+            if db.mark_failed(issue.id, result.error or "runner failed", run_dir):
+                self._increment_daily_count(db, failed=1)
             self.log.error("issue failed id=%s error=%s", issue.id, result.error)
             return CycleResult(processed=True, status="failed")
         except Exception as exc:
-            db.mark_failed(issue.id, str(exc), run_dir)
             self.log.exception("issue handling exception id=%s", issue.id)
-            return CycleResult(processed=True, status="failed")
+            marked = db.mark_failed(issue.id, str(exc), run_dir)
+        if marked:
+            self._increment_daily_count(db, failed=1)
+        return CycleResult(processed=True, status="failed")
 
-    def _increment_daily_count(self, db: Database) -> None:
-        today = date.today().isoformat()
-        db.increment_daily_done_count(today)
+    def _record_run(self, db: Database, issue: IssueRecord, result: RunnerResult) -> None:
+        try:
+            db.record_run(issue.id, issue.attempt_count, self.config.worker_id, result)
+        except Exception:
+            self.log.exception("failed to record run history id=%s", issue.id)
+            return
+        metrics = result.metrics
+        if metrics is not None:
+            self.log.info(
+                "run metrics id=%s attempt=%s duration_seconds=%s cpu_user_seconds=%s "
+                "cpu_system_seconds=%s peak_rss_kb=%s stages=%s",
+                issue.id,
+                issue.attempt_count,
+                metrics.duration_seconds,
+                metrics.cpu_user_seconds,
+                metrics.cpu_system_seconds,
+                metrics.peak_rss_kb,
+                ",".join(f"{stage}:{seconds}" for stage, seconds in metrics.stage_seconds.items()),
+            )
+
+    def _increment_daily_count(self, db: Database, *, done: int = 0, started: int = 0, failed: int = 0) -> None:
+        try:
+            db.increment_daily_counts(date.today().isoformat(), done=done, started=started, failed=failed)
+        except Exception:
+            self.log.exception("failed to update daily counters done=%s started=%s failed=%s", done, started, failed)
 
     @staticmethod
     def _label_names(issue: dict[str, object]) -> list[str]:
@@ -343,7 +658,6 @@ class DaemonService:
                 labels.append(str(label["name"]))
         return labels
 
-    def _sleep_interruptible(self, seconds: int) -> None:
-        deadline = time.monotonic() + max(0, seconds)
-        while not self._stop_requested and time.monotonic() < deadline:
-            time.sleep(min(1.0, deadline - time.monotonic()))
+    def _wait_for_wake(self, seconds: float) -> None:
+        if self._wake.wait(timeout=max(0.0, seconds)):
+            self._wake.clear()
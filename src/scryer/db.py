@@ -1,21 +1,33 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import sqlite3
+import threading
+import weakref
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
 from typing import Iterable
 
-from .models import IssueRecord
+from .models import CachedResponse, DailyCounts, IssueRecord, OutboxJob, RunnerResult, UpsertStats
 
-_SCHEMA_VERSION = 2
+_SCHEMA_VERSION = 13
+_SQL_PARAM_CHUNK = 500
+_UPSERT_BATCH = 2000
+_POOL_MAX_IDLE = 8
 
 
 def utcnow_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
+def issue_fingerprint(title: str, url: object, labels_json: str, updated_at: object) -> str:
+    content = "\0".join((title, str(url or ""), labels_json, str(updated_at or "")))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
 def _parse_labels(labels_json: str | None) -> list[str]:
     if not labels_json:
         return []
@@ -44,51 +56,158 @@ def _row_to_issue(row: sqlite3.Row) -> IssueRecord:
         completed_at=row["completed_at"],
         last_error=row["last_error"],
         last_run_dir=row["last_run_dir"],
+        details_updated_at=row["details_updated_at"],
+        details_fetched_at=row["details_fetched_at"],
+        details_state=row["details_state"],
     )
 
 
+class _Lease:
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class ConnectionPool:
+    def __init__(self, db_path: Path, busy_timeout_seconds: float, max_idle: int = _POOL_MAX_IDLE):
+        self.db_path = db_path
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._idle: list[sqlite3.Connection] = []
+        self._open: set[sqlite3.Connection] = set()
+        self._closed = False
+
+    def connection(self) -> sqlite3.Connection:
+        lease = getattr(self._local, "lease", None)
+        if lease is not None:
+            return lease.conn
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"Connection pool for {self.db_path} is closed")
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+            with self._lock:
+                self._open.add(conn)
+        lease = _Lease(conn)
+        weakref.finalize(lease, self._release, conn)
+        self._local.lease = lease
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_seconds,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            if conn not in self._open:
+                return
+            if not self._closed and len(self._idle) < self.max_idle:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.append(conn)
+                return
+            self._open.discard(conn)
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            conns = list(self._open)
+            self._open.clear()
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+_migrate_lock = threading.Lock()
+
+
+def claim_batch_sql(skip_label_count: int = 0) -> str:
+    skip_clause = ""
+    if skip_label_count:
+        skip_clause = (
+            "AND NOT EXISTS (SELECT 1 FROM issue_labels WHERE issue_labels.repo = issues.repo "
+            "AND issue_labels.issue_id = issues.id "
+            f"AND issue_labels.label IN ({', '.join('?' for _ in range(skip_label_count))}))"
+        )
+    return f"""
+        UPDATE issues
+        SET status = 'running',
+            started_at = ?,
+            lease_until = ?,
+            claimed_by = ?,
+            attempt_count = attempt_count + 1
+        WHERE rowid IN (
+          SELECT rowid
+          FROM issues
+          WHERE repo = ?
+            AND status = 'pending'
+            AND attempt_count < ?
+            {skip_clause}
+          ORDER BY COALESCE(updated_at, created_at) DESC, id ASC
+          LIMIT ?
+        )
+        RETURNING *
+        """
+
+
 class Database:
-    def __init__(self, db_path: str | Path, repo_namespace: str = "default"):
+    def __init__(
+        self,
+        db_path: str | Path,
+        repo_namespace: str = "default",
+        busy_timeout_seconds: float = 5.0,
+    ):
         self.db_path = Path(db_path)
         self.repo_namespace = repo_namespace
-        self._conn = sqlite3.connect(self.db_path)
-        self._conn.row_factory = sqlite3.Row
-        self._conn.execute("PRAGMA foreign_keys = ON")
-        self._conn.execute("PRAGMA journal_mode = WAL")
-        self._migrate()
+        self._pool = ConnectionPool(self.db_path, busy_timeout_seconds)
+        self._pool.connection()
+        with _migrate_lock:
+            self._migrate()
 
     @property
     def conn(self) -> sqlite3.Connection:
-        return self._conn
+        return self._pool.connection()
 
     def close(self) -> None:
-        self._conn.close()
+        self._pool.close()
 
     @contextmanager
     def _begin_immediate(self):
-        cur = self._conn.cursor()
+        cur = self.conn.cursor()
         cur.execute("BEGIN IMMEDIATE")
         try:
             yield cur
-            self._conn.commit()
+            self.conn.commit()
         except Exception:
-            self._conn.rollback()
+            self.conn.rollback()
             raise
         finally:
             cur.close()
 
     def _issues_table_exists(self) -> bool:
-        row = self._conn.execute(
+        row = self.conn.execute(
             "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'issues'"
         ).fetchone()
         return row is not None
 
     def _issues_has_repo_column(self) -> bool:
-        rows = self._conn.execute("PRAGMA table_info(issues)").fetchall()
+        rows = self.conn.execute("PRAGMA table_info(issues)").fetchall()
         return any(str(row["name"]) == "repo" for row in rows)
 
     def _create_schema_v2(self) -> None:
-        self._conn.executescript(
+        self.conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS issues (
               repo TEXT NOT NULL,
@@ -129,10 +248,168 @@ class Database:
             """
         )
 
+    def _create_schema_v3(self) -> None:
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+              repo TEXT NOT NULL,
+              request_key TEXT NOT NULL,
+              etag TEXT,
+              last_modified TEXT,
+              link TEXT,
+              body BLOB NOT NULL,
+              hits INTEGER NOT NULL DEFAULT 0,
+              misses INTEGER NOT NULL DEFAULT 0,
+              stored_at TEXT NOT NULL,
+              last_used_at TEXT NOT NULL,
+              PRIMARY KEY (repo, request_key)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_http_cache_repo_last_used ON http_cache(repo, last_used_at);
+            """
+        )
+
+    def _create_schema_v4(self) -> None:
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS daemon_heartbeats (
+              worker_id TEXT PRIMARY KEY,
+              repo TEXT NOT NULL,
+              seen_at TEXT NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_daemon_heartbeats_seen ON daemon_heartbeats(seen_at);
+            """
+        )
+
+    def _migrate_v4_to_v5(self) -> None:
+        columns = {str(row["name"]) for row in self.conn.execute("PRAGMA table_info(issues)").fetchall()}
+        if "details_updated_at" not in columns:
+            self.conn.execute("ALTER TABLE issues ADD COLUMN details_updated_at TEXT")
+        if "details_fetched_at" not in columns:
+            self.conn.execute("ALTER TABLE issues ADD COLUMN details_fetched_at TEXT")
+
+    def _create_schema_v6(self) -> None:
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              repo TEXT NOT NULL,
+              issue_id INTEGER NOT NULL,
+              kind TEXT NOT NULL,
+              dedupe_key TEXT NOT NULL,
+              payload_json TEXT NOT NULL,
+              status TEXT NOT NULL DEFAULT 'pending',
+              attempts INTEGER NOT NULL DEFAULT 0,
+              next_attempt_at TEXT NOT NULL,
+              last_error TEXT,
+              created_at TEXT NOT NULL,
+              completed_at TEXT,
+              UNIQUE (repo, dedupe_key)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_outbox_repo_status_next ON outbox(repo, status, next_attempt_at);
+            """
+        )
+
+    def _migrate_v6_to_v7(self) -> None:
+        columns = {str(row["name"]) for row in self.conn.execute("PRAGMA table_info(issues)").fetchall()}
+        if "fingerprint" not in columns:
+            self.conn.execute("ALTER TABLE issues ADD COLUMN fingerprint TEXT")
+
+    def _create_schema_v8(self) -> None:
+        self.conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_issues_repo_pending_claim
+            ON issues(repo, COALESCE(updated_at, created_at) DESC, id ASC)
+            WHERE status = 'pending'
+            """
+        )
+
+    def _create_schema_v9(self) -> None:
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS issue_labels (
+              repo TEXT NOT NULL,
+              issue_id INTEGER NOT NULL,
+              label TEXT NOT NULL,
+              PRIMARY KEY (repo, issue_id, label)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_issue_labels_repo_label ON issue_labels(repo, label, issue_id);
+
+            INSERT OR IGNORE INTO issue_labels (repo, issue_id, label)
+            SELECT issues.repo, issues.id, labels.value
+            FROM issues,
+                 json_each(CASE WHEN json_valid(issues.labels_json) THEN issues.labels_json ELSE '[]' END) AS labels
+            WHERE labels.type = 'text';
+            """
+        )
+
+    def _create_schema_v10(self) -> None:
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+              id INTEGER PRIMARY KEY AUTOINCREMENT,
+              repo TEXT NOT NULL,
+              issue_id INTEGER NOT NULL,
+              attempt INTEGER NOT NULL,
+              worker_id TEXT,
+              status TEXT NOT NULL,
+              exit_code INTEGER,
+              error TEXT,
+              run_dir TEXT,
+              started_at TEXT NOT NULL,
+              finished_at TEXT,
+              duration_seconds REAL,
+              stage_seconds_json TEXT,
+              cpu_user_seconds REAL,
+              cpu_system_seconds REAL,
+              peak_rss_kb INTEGER
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_runs_repo_started ON runs(repo, started_at);
+            CREATE INDEX IF NOT EXISTS idx_runs_repo_issue ON runs(repo, issue_id, started_at);
+            """
+        )
+
+    def _create_schema_v11(self) -> None:
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS daily_counters (
+              repo TEXT NOT NULL,
+              day TEXT NOT NULL,
+              done INTEGER NOT NULL DEFAULT 0,
+              started INTEGER NOT NULL DEFAULT 0,
+              failed INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (repo, day)
+            ) WITHOUT ROWID;
+
+            INSERT INTO daily_counters (repo, day, done)
+            SELECT substr(key, 1, instr(key, ':done_count:') - 1),
+                   substr(key, instr(key, ':done_count:') + length(':done_count:')),
+                   CAST(value AS INTEGER)
+            FROM meta
+            WHERE instr(key, ':done_count:') > 1
+            ON CONFLICT(repo, day) DO UPDATE SET done = MAX(daily_counters.done, excluded.done);
+
+            DELETE FROM meta WHERE instr(key, ':done_count:') > 1;
+            """
+        )
+
+    def _migrate_v11_to_v12(self) -> None:
+        columns = {str(row["name"]) for row in self.conn.execute("PRAGMA table_info(issues)").fetchall()}
+        if "details_state" not in columns:
+            self.conn.execute("ALTER TABLE issues ADD COLUMN details_state TEXT")
+
+    def _migrate_v12_to_v13(self) -> None:
+        # Cancelled rows kept their fingerprint and were never revived on reappearing.
+        self.conn.execute("UPDATE issues SET fingerprint = NULL WHERE status = 'cancelled'")
+
     def _migrate_v1_to_v2(self) -> None:
-        self._conn.execute("ALTER TABLE issues RENAME TO issues_legacy_v1")
+        self.conn.execute("ALTER TABLE issues RENAME TO issues_legacy_v1")
         self._create_schema_v2()
-        self._conn.execute(
+        self.conn.execute(
             """
             INSERT INTO issues (
               repo,
@@ -181,15 +458,15 @@ class Database:
             """,
             (self.repo_namespace,),
         )
-        self._conn.execute("DROP TABLE issues_legacy_v1")
+        self.conn.execute("DROP TABLE issues_legacy_v1")
 
     def _migrate_legacy_meta_keys(self) -> None:
-        rows = self._conn.execute(
+        rows = self.conn.execute(
             "SELECT key, value FROM meta WHERE key LIKE 'done_count:%'"
         ).fetchall()
         for row in rows:
             scoped_key = self._meta_key(str(row["key"]))
-            self._conn.execute(
+            self.conn.execute(
                 """
                 INSERT INTO meta(key, value) VALUES(?, ?)
                 ON CONFLICT(key) DO NOTHING
@@ -198,70 +475,190 @@ class Database:
             )
 
     def _migrate(self) -> None:
-        version = int(self._conn.execute("PRAGMA user_version").fetchone()[0])
+        version = int(self.conn.execute("PRAGMA user_version").fetchone()[0])
         if version >= _SCHEMA_VERSION:
             return
 
-        issues_exists = self._issues_table_exists()
-        if issues_exists and not self._issues_has_repo_column():
-            self._migrate_v1_to_v2()
-        else:
-            self._create_schema_v2()
+        if version < 2:
+            issues_exists = self._issues_table_exists()
+            if issues_exists and not self._issues_has_repo_column():
+                self._migrate_v1_to_v2()
+            else:
+                self._create_schema_v2()
+            self._migrate_legacy_meta_keys()
+
+        if version < 3:
+            self._create_schema_v3()
+
+        if version < 4:
+            self._create_schema_v4()
+
+        if version < 5:
+            self._migrate_v4_to_v5()
+
+        if version < 6:
+            self._create_schema_v6()
+
+        if version < 7:
+            self._migrate_v6_to_v7()
+
+        if version < 8:
+            self._create_schema_v8()
 
-        self._migrate_legacy_meta_keys()
-        self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
-        self._conn.commit()
+        if version < 9:
+            self._create_schema_v9()
+
+        if version < 10:
+            self._create_schema_v10()
+
+        if version < 11:
+            self._create_schema_v11()
+
+        if version < 12:
+            self._migrate_v11_to_v12()
+
+        if version < 13:
+            self._migrate_v12_to_v13()
+
+        self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.conn.commit()
 
     def _meta_key(self, key: str) -> str:
         return f"{self.repo_namespace}:{key}"
 
-    def upsert_polled_issues(self, issues: Iterable[dict[str, object]]) -> None:
+    def upsert_polled_issues(
+        self,
+        issues: Iterable[dict[str, object]],
+        batch_size: int = _UPSERT_BATCH,
+    ) -> UpsertStats:
         now = utcnow_iso()
+        stats = UpsertStats()
+        pending = iter(issues)
+        while batch := list(islice(pending, max(1, batch_size))):
+            self._upsert_batch(batch, now, stats)
+        return stats
+
+    def _upsert_batch(self, issues: list[dict[str, object]], now: str, stats: UpsertStats) -> None:
+        incoming: dict[int, tuple[object, ...]] = {}
+        labels: dict[int, list[str]] = {}
+        namespace = self.repo_namespace
+        for issue in issues:
+            title = str(issue["title"])
+            url = issue.get("url")
+            issue_labels = [str(label) for label in issue.get("labels", [])]
+            labels_json = json.dumps(issue_labels)
+            updated_at = issue.get("updated_at")
+            issue_id = int(issue["id"])
+            incoming[issue_id] = (
+                namespace,
+                issue_id,
+                title,
+                issue.get("body"),
+                url,
+                labels_json,
+                updated_at,
+                now,
+                issue_fingerprint(title, url, labels_json, updated_at),
+            )
+            labels[issue_id] = issue_labels
+
+        stored = self._stored_rows(list(incoming))
+        writes: list[tuple[object, ...]] = []
+        new_labels: dict[int, list[str]] = {}
+        changed_labels: dict[int, list[str]] = {}
+        for issue_id, row in incoming.items():
+            if issue_id not in stored:
+                stats.inserted += 1
+                new_labels[issue_id] = labels[issue_id]
+            elif stored[issue_id][0] != row[-1]:
+                stats.changed += 1
+                if stored[issue_id][1] != row[5]:
+                    changed_labels[issue_id] = labels[issue_id]
+            else:
+                stats.unchanged += 1
+                continue
+            writes.append(row)
+        if not writes:
+            return
+
         with self.conn:
-            for issue in issues:
-                self.conn.execute(
-                    """
-                    INSERT INTO issues (
-                      repo,
-                      id,
-                      title,
-                      body,
-                      url,
-                      labels_json,
-                      status,
-                      updated_at,
-                      created_at
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?)
-                    ON CONFLICT(repo, id) DO UPDATE SET
-                      title = excluded.title,
-                      body = COALESCE(excluded.body, issues.body),
-                      url = excluded.url,
-                      labels_json = excluded.labels_json,
-                      updated_at = excluded.updated_at
-                    """,
-                    (
-                        self.repo_namespace,
-                        int(issue["id"]),
-                        str(issue["title"]),
-                        issue.get("body"),
-                        issue.get("url"),
-                        json.dumps(issue.get("labels", [])),
-                        issue.get("updated_at"),
-                        now,
-                    ),
+            self.conn.executemany(
+                """
+                INSERT INTO issues (
+                  repo,
+                  id,
+                  title,
+                  body,
+                  url,
+                  labels_json,
+                  status,
+                  updated_at,
+                  created_at,
+                  fingerprint
                 )
+                VALUES (?, ?, ?, ?, ?, ?, 'pending', ?, ?, ?)
+                ON CONFLICT(repo, id) DO UPDATE SET
+                  title = excluded.title,
+                  body = COALESCE(excluded.body, issues.body),
+                  url = excluded.url,
+                  labels_json = excluded.labels_json,
+                  updated_at = excluded.updated_at,
+                  fingerprint = excluded.fingerprint,
+                  status = CASE WHEN issues.status = 'cancelled' THEN 'pending' ELSE issues.status END,
+                  attempt_count = CASE WHEN issues.status = 'cancelled' THEN 0 ELSE issues.attempt_count END
+                """,
+                writes,
+            )
+            self._replace_labels(changed_labels)
+            self._insert_labels(new_labels)
+
+    def _replace_labels(self, labels: dict[int, list[str]]) -> None:
+        self.conn.executemany(
+            "DELETE FROM issue_labels WHERE repo = ? AND issue_id = ?",
+            [(self.repo_namespace, issue_id) for issue_id in labels],
+        )
+        self._insert_labels(labels)
+
+    def _insert_labels(self, labels: dict[int, list[str]]) -> None:
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO issue_labels (repo, issue_id, label) VALUES (?, ?, ?)",
+            [
+                (self.repo_namespace, issue_id, label)
+                for issue_id, issue_labels in labels.items()
+                for label in issue_labels
+            ],
+        )
+
+    def _stored_rows(self, issue_ids: list[int]) -> dict[int, tuple[str | None, str | None]]:
+        stored: dict[int, tuple[str | None, str | None]] = {}
+        for start in range(0, len(issue_ids), _SQL_PARAM_CHUNK):
+            chunk = issue_ids[start : start + _SQL_PARAM_CHUNK]
+            rows = self.conn.execute(
+                f"""
+                SELECT id, fingerprint, labels_json
+                FROM issues
+                WHERE repo = ?
+                  AND id IN ({', '.join('?' for _ in chunk)})
+                """,
+                (self.repo_namespace, *chunk),
+            ).fetchall()
+            stored.update({int(row["id"]): (row["fingerprint"], row["labels_json"]) for row in rows})
+        return stored
 
     def update_issue_details(self, issue: dict[str, object]) -> None:
+        labels = [str(label) for label in issue.get("labels", [])]
         with self.conn:
-            self.conn.execute(
+            updated = self.conn.execute(
                 """
                 UPDATE issues
                 SET title = ?,
                     body = ?,
                     url = ?,
                     labels_json = ?,
-                    updated_at = ?
+                    updated_at = ?,
+                    details_updated_at = ?,
+                    details_fetched_at = ?,
+                    details_state = ?
                 WHERE repo = ?
                   AND id = ?
                 """,
@@ -269,12 +666,17 @@ class Database:
                     issue.get("title"),
                     issue.get("body"),
                     issue.get("url"),
-                    json.dumps(issue.get("labels", [])),
+                    json.dumps(labels),
                     issue.get("updated_at"),
+                    issue.get("updated_at"),
+                    utcnow_iso(),
+                    issue.get("state"),
                     self.repo_namespace,
                     int(issue["id"]),
                 ),
             )
+            if updated.rowcount:
+                self._replace_labels({int(issue["id"]): labels})
 
     def requeue_expired_leases(self) -> int:
         now = utcnow_iso()
@@ -300,38 +702,34 @@ class Database:
         worker_id: str,
         max_attempts: int,
         lease_seconds: int,
+        skip_labels: Iterable[str] = (),
     ) -> IssueRecord | None:
+        claimed = self.claim_pending_batch(1, worker_id, max_attempts, lease_seconds, skip_labels)
+        return claimed[0] if claimed else None
+
+    def claim_pending_batch(
+        self,
+        limit: int,
+        worker_id: str,
+        max_attempts: int,
+        lease_seconds: int,
+        skip_labels: Iterable[str] = (),
+    ) -> list[IssueRecord]:
+        if limit <= 0:
+            return []
         lease_until = (
             datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
         ).isoformat(timespec="seconds").replace("+00:00", "Z")
         started_at = utcnow_iso()
-
-        while True:
-            with self._begin_immediate() as cur:
-                row = cur.execute(
-                    """
-                    SELECT *
-                    FROM issues
-                    WHERE repo = ?
-                      AND status = 'pending'
-                      AND attempt_count < ?
-                    ORDER BY COALESCE(updated_at, created_at) DESC, id ASC
-                    LIMIT 1
-                    """,
-                    (self.repo_namespace, max_attempts),
-                ).fetchone()
-                if row is None:
-                    return None
-
-                claimed = self._claim_issue(
-                    cur=cur,
-                    issue_id=int(row["id"]),
-                    started_at=started_at,
-                    lease_until=lease_until,
-                    worker_id=worker_id,
-                )
-                if claimed is not None:
-                    return claimed
+        skip = sorted(set(skip_labels))
+        with self._begin_immediate() as cur:
+            rows = cur.execute(
+                claim_batch_sql(len(skip)),
+                (started_at, lease_until, worker_id, self.repo_namespace, max_attempts, *skip, limit),
+            ).fetchall()
+        rows.sort(key=lambda row: int(row["id"]))
+        rows.sort(key=lambda row: row["updated_at"] or row["created_at"] or "", reverse=True)
+        return [_row_to_issue(row) for row in rows]
 
     def claim_pending_by_id(
         self,
@@ -399,40 +797,298 @@ class Database:
             return None
         return _row_to_issue(claimed)
 
-    def mark_done(
+    def list_issue_ids(self, status: str) -> list[int]:
+        rows = self.conn.execute(
+            "SELECT id FROM issues WHERE repo = ? AND status = ? ORDER BY id ASC",
+            (self.repo_namespace, status),
+        ).fetchall()
+        return [int(row["id"]) for row in rows]
+
+    def get_issue_statuses(self, issue_ids: Iterable[int]) -> dict[int, str]:
+        ids = sorted({int(issue_id) for issue_id in issue_ids})
+        statuses: dict[int, str] = {}
+        for start in range(0, len(ids), _SQL_PARAM_CHUNK):
+            chunk = ids[start : start + _SQL_PARAM_CHUNK]
+            rows = self.conn.execute(
+                f"""
+                SELECT id, status
+                FROM issues
+                WHERE repo = ?
+                  AND id IN ({', '.join('?' for _ in chunk)})
+                """,
+                (self.repo_namespace, *chunk),
+            ).fetchall()
+            statuses.update({int(row["id"]): str(row["status"]) for row in rows})
+        return statuses
+
+    def cancel_issues(self, issue_ids: Iterable[int], reason: str) -> list[int]:
+        ids = sorted({int(issue_id) for issue_id in issue_ids})
+        if not ids:
+            return []
+        completed_at = utcnow_iso()
+        cancelled: list[int] = []
+        with self._begin_immediate() as cur:
+            for start in range(0, len(ids), _SQL_PARAM_CHUNK):
+                chunk = ids[start : start + _SQL_PARAM_CHUNK]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = cur.execute(
+                    f"""
+                    SELECT id
+                    FROM issues
+                    WHERE repo = ?
+                      AND status IN ('pending', 'running')
+                      AND id IN ({placeholders})
+                    """,
+                    (self.repo_namespace, *chunk),
+                ).fetchall()
+                cur.execute(
+                    f"""
+                    UPDATE issues
+                    SET status = 'cancelled',
+                        lease_until = NULL,
+                        claimed_by = NULL,
+                        completed_at = ?,
+                        last_error = ?,
+                        fingerprint = NULL
+                    WHERE repo = ?
+                      AND status IN ('pending', 'running')
+                      AND id IN ({placeholders})
+                    """,
+                    (completed_at, reason, self.repo_namespace, *chunk),
+                )
+                cancelled.extend(int(row["id"]) for row in rows)
+        return cancelled
+
+    def cancel_missing_issues(self, open_ids: Iterable[int], reason: str) -> list[int]:
+        open_set = {int(issue_id) for issue_id in open_ids}
+        rows = self.conn.execute(
+            """
+            SELECT id
+            FROM issues
+            WHERE repo = ?
+              AND status IN ('pending', 'running')
+            """,
+            (self.repo_namespace,),
+        ).fetchall()
+        return self.cancel_issues([int(row["id"]) for row in rows if int(row["id"]) not in open_set], reason)
+
+    def mark_pushed(
         self,
         issue_id: int,
-        pr_number: int | None,
-        pr_url: str | None,
         branch: str,
         head_sha: str | None,
         run_dir: str | None,
-    ) -> None:
-        completed_at = utcnow_iso()
+        pr_job: dict[str, object],
+    ) -> bool:
+        now = utcnow_iso()
         with self.conn:
-            self.conn.execute(
+            updated = self.conn.execute(
                 """
                 UPDATE issues
-                SET status = 'done',
-                    pr_number = ?,
-                    pr_url = ?,
+                SET status = 'pushed',
                     branch = ?,
                     head_sha = ?,
                     lease_until = NULL,
                     claimed_by = NULL,
-                    completed_at = ?,
                     last_error = NULL,
                     last_run_dir = ?
                 WHERE repo = ?
                   AND id = ?
+                  AND status != 'cancelled'
                 """,
-                (pr_number, pr_url, branch, head_sha, completed_at, run_dir, self.repo_namespace, issue_id),
+                (branch, head_sha, run_dir, self.repo_namespace, issue_id),
             )
+            if updated.rowcount != 1:
+                return False
+            self._enqueue_outbox(issue_id, "create_pr", f"pr:{branch}", pr_job, now, reset=True)
+        return True
 
-    def mark_failed(self, issue_id: int, error: str, run_dir: str | None) -> None:
-        completed_at = utcnow_iso()
+    def mark_pr_opened(
+        self,
+        job_id: int,
+        issue_id: int,
+        pr_number: int | None,
+        pr_url: str | None,
+        comment_job: dict[str, object] | None = None,
+    ) -> None:
+        now = utcnow_iso()
         with self.conn:
             self.conn.execute(
+                """
+                UPDATE issues
+                SET status = 'done',
+                    pr_number = ?,
+                    pr_url = ?,
+                    completed_at = ?
+                WHERE repo = ?
+                  AND id = ?
+                  AND status = 'pushed'
+                """,
+                (pr_number, pr_url, now, self.repo_namespace, issue_id),
+            )
+            if comment_job is not None:
+                self._enqueue_outbox(
+                    issue_id,
+                    "comment",
+                    f"comment:{issue_id}:{pr_number or pr_url}",
+                    comment_job,
+                    now,
+                    reset=False,
+                )
+            self._complete_outbox_job(job_id, now)
+
+    def _enqueue_outbox(
+        self,
+        issue_id: int,
+        kind: str,
+        dedupe_key: str,
+        payload: dict[str, object],
+        now: str,
+        reset: bool,
+    ) -> None:
+        conflict = (
+            """
+            DO UPDATE SET
+              issue_id = excluded.issue_id,
+              kind = excluded.kind,
+              payload_json = excluded.payload_json,
+              status = 'pending',
+              attempts = 0,
+              next_attempt_at = excluded.next_attempt_at,
+              last_error = NULL,
+              completed_at = NULL
+            """
+            if reset
+            else "DO NOTHING"
+        )
+        self.conn.execute(
+            f"""
+            INSERT INTO outbox (
+              repo,
+              issue_id,
+              kind,
+              dedupe_key,
+              payload_json,
+              status,
+              next_attempt_at,
+              created_at
+            )
+            VALUES (?, ?, ?, ?, ?, 'pending', ?, ?)
+            ON CONFLICT(repo, dedupe_key) {conflict}
+            """,
+            (self.repo_namespace, issue_id, kind, dedupe_key, json.dumps(payload), now, now),
+        )
+
+    def claim_outbox_jobs(self, limit: int, lease_seconds: int) -> list[OutboxJob]:
+        now = utcnow_iso()
+        lease_until = (
+            datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        ).isoformat(timespec="seconds").replace("+00:00", "Z")
+        with self._begin_immediate() as cur:
+            rows = cur.execute(
+                """
+                SELECT id, issue_id, kind, dedupe_key, payload_json, attempts
+                FROM outbox
+                WHERE repo = ?
+                  AND status = 'pending'
+                  AND next_attempt_at <= ?
+                ORDER BY next_attempt_at ASC, id ASC
+                LIMIT ?
+                """,
+                (self.repo_namespace, now, limit),
+            ).fetchall()
+            cur.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ? WHERE id = ?",
+                [(lease_until, int(row["id"])) for row in rows],
+            )
+        return [
+            OutboxJob(
+                id=int(row["id"]),
+                issue_id=int(row["issue_id"]),
+                kind=str(row["kind"]),
+                dedupe_key=str(row["dedupe_key"]),
+                payload=json.loads(row["payload_json"]),
+                attempts=int(row["attempts"]) + 1,
+            )
+            for row in rows
+        ]
+
+    def complete_outbox_job(self, job_id: int) -> None:
+        with self.conn:
+            self._complete_outbox_job(job_id, utcnow_iso())
+
+    def _complete_outbox_job(self, job_id: int, now: str) -> None:
+        self.conn.execute(
+            """
+            UPDATE outbox
+            SET status = 'done',
+                completed_at = ?,
+                last_error = NULL
+            WHERE id = ?
+            """,
+            (now, job_id),
+        )
+
+    def reschedule_outbox_job(self, job_id: int, delay_seconds: int, error: str) -> None:
+        next_attempt_at = (
+            datetime.now(timezone.utc) + timedelta(seconds=max(0, delay_seconds))
+        ).isoformat(timespec="seconds").replace("+00:00", "Z")
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE outbox
+                SET next_attempt_at = ?,
+                    last_error = ?
+                WHERE id = ?
+                """,
+                (next_attempt_at, error, job_id),
+            )
+
+    def dead_letter_outbox_job(self, job_id: int, issue_id: int, kind: str, error: str) -> None:
+        now = utcnow_iso()
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE outbox
+                SET status = 'dead',
+                    completed_at = ?,
+                    last_error = ?
+                WHERE id = ?
+                """,
+                (now, error, job_id),
+            )
+            if kind == "create_pr":
+                self.conn.execute(
+                    """
+                    UPDATE issues
+                    SET status = 'failed',
+                        completed_at = ?,
+                        last_error = ?
+                    WHERE repo = ?
+                      AND id = ?
+                      AND status = 'pushed'
+                    """,
+                    (now, f"PR creation failed: {error}", self.repo_namespace, issue_id),
+                )
+
+    def get_outbox_counts(self, status: str = "pending") -> dict[str, int]:
+        rows = self.conn.execute(
+            """
+            SELECT kind, COUNT(*) AS count
+            FROM outbox
+            WHERE repo = ?
+              AND status = ?
+            GROUP BY kind
+            ORDER BY kind ASC
+            """,
+            (self.repo_namespace, status),
+        ).fetchall()
+        return {str(row["kind"]): int(row["count"]) for row in rows}
+
+    def mark_failed(self, issue_id: int, error: str, run_dir: str | None) -> bool:
+        completed_at = utcnow_iso()
+        with self.conn:
+            updated = self.conn.execute(
                 """
                 UPDATE issues
                 SET status = 'failed',
@@ -443,14 +1099,16 @@ class Database:
                     last_run_dir = ?
                 WHERE repo = ?
                   AND id = ?
+                  AND status != 'cancelled'
                 """,
                 (completed_at, error, run_dir, self.repo_namespace, issue_id),
             )
+        return updated.rowcount == 1
 
-    def mark_timeout(self, issue_id: int, error: str, run_dir: str | None) -> None:
+    def mark_timeout(self, issue_id: int, error: str, run_dir: str | None) -> bool:
         completed_at = utcnow_iso()
         with self.conn:
-            self.conn.execute(
+            updated = self.conn.execute(
                 """
                 UPDATE issues
                 SET status = 'timeout',
@@ -461,9 +1119,11 @@ class Database:
                     last_run_dir = ?
                 WHERE repo = ?
                   AND id = ?
+                  AND status != 'cancelled'
                 """,
                 (completed_at, error, run_dir, self.repo_namespace, issue_id),
             )
+        return updated.rowcount == 1
 
     def mark_skipped(self, issue_id: int, reason: str, run_dir: str | None) -> None:
         completed_at = utcnow_iso()
@@ -479,10 +1139,82 @@ class Database:
                     last_run_dir = ?
                 WHERE repo = ?
                   AND id = ?
+                  AND status != 'cancelled'
                 """,
                 (completed_at, reason, run_dir, self.repo_namespace, issue_id),
             )
 
+    def record_run(self, issue_id: int, attempt: int, worker_id: str, result: RunnerResult) -> None:
+        metrics = result.metrics
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO runs (
+                  repo,
+                  issue_id,
+                  attempt,
+                  worker_id,
+                  status,
+                  exit_code,
+                  error,
+                  run_dir,
+                  started_at,
+                  finished_at,
+                  duration_seconds,
+                  stage_seconds_json,
+                  cpu_user_seconds,
+                  cpu_system_seconds,
+                  peak_rss_kb
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.repo_namespace,
+                    issue_id,
+                    attempt,
+                    worker_id,
+                    result.status,
+                    result.exit_code,
+                    result.error,
+                    str(result.run_dir),
+                    metrics.started_at if metrics else utcnow_iso(),
+                    metrics.finished_at if metrics else None,
+                    metrics.duration_seconds if metrics else None,
+                    json.dumps(metrics.stage_seconds, sort_keys=True) if metrics else None,
+                    metrics.cpu_user_seconds if metrics else None,
+                    metrics.cpu_system_seconds if metrics else None,
+                    metrics.peak_rss_kb if metrics else None,
+                ),
+            )
+
+    def get_run_stats(self, since: str) -> dict[str, dict[str, float]]:
+        rows = self.conn.execute(
+            """
+            SELECT status,
+                   COUNT(*) AS count,
+                   AVG(duration_seconds) AS avg_seconds,
+                   MAX(duration_seconds) AS max_seconds,
+                   SUM(cpu_user_seconds + cpu_system_seconds) AS cpu_seconds,
+                   MAX(peak_rss_kb) AS peak_rss_kb
+            FROM runs
+            WHERE repo = ?
+              AND started_at >= ?
+            GROUP BY status
+            ORDER BY status ASC
+            """,
+            (self.repo_namespace, since),
+        ).fetchall()
+        return {
+            str(row["status"]): {
+                "count": int(row["count"]),
+                "avg_seconds": float(row["avg_seconds"] or 0.0),
+                "max_seconds": float(row["max_seconds"] or 0.0),
+                "cpu_seconds": float(row["cpu_seconds"] or 0.0),
+                "peak_rss_kb": int(row["peak_rss_kb"] or 0),
+            }
+            for row in rows
+        }
+
     def get_status_counts(self) -> dict[str, int]:
         rows = self.conn.execute(
             """
@@ -496,17 +1228,155 @@ class Database:
         ).fetchall()
         return {str(row["status"]): int(row["count"]) for row in rows}
 
-    def clear_namespace_state(self) -> tuple[int, int]:
+    def get_label_status_counts(self, labels: Iterable[str]) -> dict[str, dict[str, int]]:
+        names = sorted(set(labels))
+        if not names:
+            return {}
+        rows = self.conn.execute(
+            f"""
+            SELECT issue_labels.label AS label, issues.status AS status, COUNT(*) AS count
+            FROM issue_labels
+            JOIN issues
+              ON issues.repo = issue_labels.repo
+             AND issues.id = issue_labels.issue_id
+            WHERE issue_labels.repo = ?
+              AND issue_labels.label IN ({', '.join('?' for _ in names)})
+            GROUP BY issue_labels.label, issues.status
+            ORDER BY issue_labels.label ASC, issues.status ASC
+            """,
+            (self.repo_namespace, *names),
+        ).fetchall()
+        counts: dict[str, dict[str, int]] = {}
+        for row in rows:
+            counts.setdefault(str(row["label"]), {})[str(row["status"])] = int(row["count"])
+        return counts
+
+    def clear_namespace_state(self) -> tuple[int, int, int, int, int, int]:
         with self.conn:
             issues_deleted = self.conn.execute(
                 "DELETE FROM issues WHERE repo = ?",
                 (self.repo_namespace,),
             ).rowcount
+            self.conn.execute(
+                "DELETE FROM issue_labels WHERE repo = ?",
+                (self.repo_namespace,),
+            )
+            runs_deleted = self.conn.execute(
+                "DELETE FROM runs WHERE repo = ?",
+                (self.repo_namespace,),
+            ).rowcount
+            counters_deleted = self.conn.execute(
+                "DELETE FROM daily_counters WHERE repo = ?",
+                (self.repo_namespace,),
+            ).rowcount
             meta_deleted = self.conn.execute(
                 "DELETE FROM meta WHERE key LIKE ?",
                 (f"{self.repo_namespace}:%",),
             ).rowcount
-        return issues_deleted, meta_deleted
+            cache_deleted = self.conn.execute(
+                "DELETE FROM http_cache WHERE repo = ?",
+                (self.repo_namespace,),
+            ).rowcount
+            outbox_deleted = self.conn.execute(
+                "DELETE FROM outbox WHERE repo = ?",
+                (self.repo_namespace,),
+            ).rowcount
+        return issues_deleted, meta_deleted, cache_deleted, outbox_deleted, runs_deleted, counters_deleted
+
+    def get_cached_response(self, request_key: str) -> CachedResponse | None:
+        row = self.conn.execute(
+            """
+            SELECT etag, last_modified, link, body
+            FROM http_cache
+            WHERE repo = ?
+              AND request_key = ?
+            """,
+            (self.repo_namespace, request_key),
+        ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(
+            etag=row["etag"],
+            last_modified=row["last_modified"],
+            link=row["link"],
+            body=bytes(row["body"]),
+        )
+
+    def store_cached_response(
+        self,
+        request_key: str,
+        etag: str | None,
+        last_modified: str | None,
+        link: str | None,
+        body: bytes,
+    ) -> None:
+        now = utcnow_iso()
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO http_cache (
+                  repo,
+                  request_key,
+                  etag,
+                  last_modified,
+                  link,
+                  body,
+                  misses,
+                  stored_at,
+                  last_used_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(repo, request_key) DO UPDATE SET
+                  etag = excluded.etag,
+                  last_modified = excluded.last_modified,
+                  link = excluded.link,
+                  body = excluded.body,
+                  misses = http_cache.misses + 1,
+                  stored_at = excluded.stored_at,
+                  last_used_at = excluded.last_used_at
+                """,
+                (self.repo_namespace, request_key, etag, last_modified, link, body, now, now),
+            )
+
+    def record_cache_hit(self, request_key: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                """
+                UPDATE http_cache
+                SET hits = hits + 1,
+                    last_used_at = ?
+                WHERE repo = ?
+                  AND request_key = ?
+                """,
+                (utcnow_iso(), self.repo_namespace, request_key),
+            )
+
+    def prune_http_cache(self, max_age_seconds: int) -> int:
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+        ).isoformat(timespec="seconds").replace("+00:00", "Z")
+        with self.conn:
+            return self.conn.execute(
+                "DELETE FROM http_cache WHERE repo = ? AND last_used_at < ?",
+                (self.repo_namespace, cutoff),
+            ).rowcount
+
+    def get_http_cache_stats(self) -> dict[str, int]:
+        row = self.conn.execute(
+            """
+            SELECT COUNT(*) AS entries,
+                   COALESCE(SUM(hits), 0) AS hits,
+                   COALESCE(SUM(misses), 0) AS misses
+            FROM http_cache
+            WHERE repo = ?
+            """,
+            (self.repo_namespace,),
+        ).fetchone()
+        return {
+            "entries": int(row["entries"]),
+            "hits": int(row["hits"]),
+            "misses": int(row["misses"]),
+        }
 
     def get_meta(self, key: str) -> str | None:
         row = self.conn.execute(
@@ -527,32 +1397,60 @@ class Database:
                 (self._meta_key(key), value),
             )
 
-    def get_daily_done_count(self, date_yyyy_mm_dd: str) -> int:
-        key = f"done_count:{date_yyyy_mm_dd}"
-        value = self.get_meta(key)
-        if value is None:
-            return 0
-        try:
-            return int(value)
-        except ValueError:
-            return 0
-
-    def increment_daily_done_count(self, date_yyyy_mm_dd: str) -> int:
-        key = self._meta_key(f"done_count:{date_yyyy_mm_dd}")
-        with self._begin_immediate() as cur:
-            row = cur.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
-            current = 0
-            if row is not None:
-                try:
-                    current = int(row["value"])
-                except (ValueError, TypeError):
-                    current = 0
-            current += 1
-            cur.execute(
+    def record_daemon_heartbeat(self, worker_id: str) -> None:
+        with self.conn:
+            self.conn.execute(
                 """
-                INSERT INTO meta(key, value) VALUES(?, ?)
-                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+                INSERT INTO daemon_heartbeats(worker_id, repo, seen_at) VALUES(?, ?, ?)
+                ON CONFLICT(worker_id) DO UPDATE SET
+                  repo = excluded.repo,
+                  seen_at = excluded.seen_at
                 """,
-                (key, str(current)),
+                (worker_id, self.repo_namespace, utcnow_iso()),
             )
-            return current
+
+    def remove_daemon_heartbeat(self, worker_id: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM daemon_heartbeats WHERE worker_id = ?", (worker_id,))
+
+    def count_active_daemons(self, within_seconds: int) -> int:
+        cutoff = (
+            datetime.now(timezone.utc) - timedelta(seconds=within_seconds)
+        ).isoformat(timespec="seconds").replace("+00:00", "Z")
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS count FROM daemon_heartbeats WHERE seen_at >= ?",
+            (cutoff,),
+        ).fetchone()
+        return int(row["count"])
+
+    def get_daily_counts(self, day: str) -> DailyCounts:
+        row = self.conn.execute(
+            "SELECT done, started, failed FROM daily_counters WHERE repo = ? AND day = ?",
+            (self.repo_namespace, day),
+        ).fetchone()
+        if row is None:
+            return DailyCounts(day=day)
+        return DailyCounts(day=day, done=int(row["done"]), started=int(row["started"]), failed=int(row["failed"]))
+
+    def increment_daily_counts(
+        self,
+        day: str,
+        *,
+        done: int = 0,
+        started: int = 0,
+        failed: int = 0,
+    ) -> DailyCounts:
+        with self.conn:
+            row = self.conn.execute(
+                """
+                INSERT INTO daily_counters (repo, day, done, started, failed)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(repo, day) DO UPDATE SET
+                  done = daily_counters.done + excluded.done,
+                  started = daily_counters.started + excluded.started,
+                  failed = daily_counters.failed + excluded.failed
+                RETURNING done, started, failed
+                """,
+                (self.repo_namespace, day, done, started, failed),
+            ).fetchone()
+        return DailyCounts(day=day, done=int(row["done"]), started=int(row["started"]), failed=int(row["failed"]))
@@ -1,11 +1,36 @@
 from __future__ import annotations
 
 import json
+import logging
 import re
-import subprocess
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from .cassette import Cassette, run_command
+from .ratelimit import RateLimitTracker
+from .resilience import (
+    GH_OPERATIONS,
+    CircuitBreaker,
+    ResiliencePolicy,
+    is_permanent,
+    is_secondary_rate_limit,
+    is_transient,
+)
+
+T = TypeVar("T")
+
+_ISSUE_DETAIL_FIELDS = "number title body url state updatedAt labels(first: 100) { nodes { name } }"
+_ISSUE_BATCH_SIZE = 50
+_ISSUE_SEARCH_QUERY = """
+query($q: String!, $first: Int!, $after: String) {
+  search(query: $q, type: ISSUE, first: $first, after: $after) {
+    pageInfo { hasNextPage endCursor }
+    nodes { ... on Issue { number title url createdAt updatedAt labels(first: 100) { nodes { name } } } }
+  }
+}
+"""
 
 
 @dataclass(slots=True)
@@ -14,6 +39,7 @@ class GhError(RuntimeError):
     exit_code: int
     stdout: str
     stderr: str
+    network: bool = False
 
     def __str__(self) -> str:
         return (
@@ -21,20 +47,85 @@ class GhError(RuntimeError):
             f"stderr: {self.stderr.strip()}"
         )
 
+    @property
+    def transient(self) -> bool:
+        return self.network or is_transient(self.exit_code, self.stdout, self.stderr)
+
+    @property
+    def permanent(self) -> bool:
+        return not self.network and is_permanent(self.exit_code, self.stdout, self.stderr)
+
+
+class CircuitOpenError(GhError):
+    def __str__(self) -> str:
+        return self.stderr
+
 
 class GhClient:
-    def __init__(self, repo_root: Path):
+    # Search-backed listings stop paginating after this many results.
+    listing_cap: int | None = 1000
+    # Searches go through GraphQL and bill the graphql resource, not REST search.
+    rate_limit_resources: tuple[str, ...] = ("core", "graphql")
+
+    def __init__(self, repo_root: Path, policy: ResiliencePolicy | None = None):
         self.repo_root = repo_root
+        self.rate_limit = RateLimitTracker()
+        self.cassette: Cassette | None = None
+        self.policy = policy or ResiliencePolicy()
+        self.breakers = {
+            op: CircuitBreaker(op, self.policy.breaker_threshold, self.policy.breaker_reset_seconds)
+            for op in GH_OPERATIONS
+        }
+        self.log = logging.getLogger(__name__)
+
+    def close(self) -> None:
+        return None
+
+    def _call(self, op: str, fn: Callable[[], T], idempotent: bool = True) -> T:
+        breaker = self.breakers[op]
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(
+                    [op],
+                    0,
+                    "",
+                    f"GitHub {op} operations suspended: circuit open, retry in {breaker.retry_in():.0f}s",
+                )
+            try:
+                result = fn()
+            except GhError as exc:
+                if not exc.transient:
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                retryable = idempotent or is_secondary_rate_limit(exc.exit_code, exc.stdout, exc.stderr)
+                attempt += 1
+                if not retryable or attempt >= self.policy.retry_attempts:
+                    raise
+                delay = self.policy.backoff(attempt)
+                lines = exc.stderr.strip().splitlines()
+                self.log.warning(
+                    "gh transient failure op=%s attempt=%s exit_code=%s retry_in_seconds=%.2f error=%s",
+                    op,
+                    attempt,
+                    exc.exit_code,
+                    delay,
+                    lines[-1] if lines else "",
+                )
+                time.sleep(delay)
+                continue
+            except BaseException:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return result
 
     def _run(self, args: list[str]) -> str:
         cmd = ["gh", *args]
-        proc = subprocess.run(
-            cmd,
-            cwd=self.repo_root,
-            text=True,
-            capture_output=True,
-            check=False,
-        )
+        if args[:2] != ["api", "rate_limit"]:
+            self.rate_limit.record_call()
+        proc = run_command("gh", cmd, self.repo_root, self.cassette)
         if proc.returncode != 0:
             raise GhError(
                 cmd=cmd,
@@ -45,7 +136,10 @@ class GhClient:
         return proc.stdout or ""
 
     def gh_json(self, args: list[str]) -> Any:
-        raw = self._run(args)
+        return self._parse_json(args, self._run(args))
+
+    @staticmethod
+    def _parse_json(args: list[str], raw: str) -> Any:
         if not raw.strip():
             return None
         try:
@@ -56,55 +150,235 @@ class GhClient:
     def gh_text(self, args: list[str]) -> str:
         return self._run(args)
 
-    def list_open_issues(self, trigger_label: str, limit: int = 100) -> list[dict[str, Any]]:
-        query = f"is:issue is:open label:{trigger_label} sort:updated-desc"
-        data = self.gh_json(
-            [
-                "issue",
-                "list",
-                "--search",
-                query,
-                "--limit",
-                str(limit),
-                "--json",
-                "number,title,updatedAt,createdAt,url,labels",
-            ]
-        )
+    def refresh_rate_limit(self) -> None:
+        if self.rate_limit.is_fresh(self.rate_limit_resources):
+            return
+        self.rate_limit.update_from_payload(self._rate_limit_payload())
+
+    def _rate_limit_payload(self) -> Any:
+        return self.gh_json(["api", "rate_limit"])
+
+    def graphql(self, query: str, variables: dict[str, object] | None = None) -> dict[str, Any]:
+        return self._graphql(query, variables, [])
+
+    def repo_graphql(self, query: str, variables: dict[str, object] | None = None) -> dict[str, Any]:
+        return self._graphql(query, variables, ["-F", "owner={owner}", "-F", "name={repo}"])
+
+    def _graphql(
+        self,
+        query: str,
+        variables: dict[str, object] | None,
+        extra_args: list[str],
+    ) -> dict[str, Any]:
+        args = ["api", "graphql", "-f", f"query={query}", *extra_args]
+        for key, value in (variables or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, (bool, int)):
+                args.extend(["-F", f"{key}={json.dumps(value)}"])
+            else:
+                args.extend(["-f", f"{key}={value}"])
+        data = self.gh_json(args)
+        if not isinstance(data, dict):
+            raise GhError(["api", "graphql"], 1, str(data), "Unexpected GraphQL payload")
+        if data.get("errors"):
+            raise GhError(["api", "graphql"], 1, json.dumps(data), json.dumps(data["errors"]))
+        return data.get("data") or {}
+
+    @staticmethod
+    def _issue_from_graphql(node: dict[str, Any]) -> dict[str, Any]:
+        labels = node.get("labels") or {}
+        return {
+            "number": node.get("number"),
+            "title": node.get("title"),
+            "body": node.get("body"),
+            "url": node.get("url"),
+            "labels": [
+                {"name": label.get("name")}
+                for label in labels.get("nodes", [])
+                if isinstance(label, dict)
+            ],
+            "state": node.get("state"),
+            "createdAt": node.get("createdAt"),
+            "updatedAt": node.get("updatedAt"),
+        }
+
+    @staticmethod
+    def _label_term(label: str) -> str:
+        if any(char.isspace() for char in label):
+            return f'label:"{label}"'
+        return f"label:{label}"
+
+    @classmethod
+    def _open_issues_query(
+        cls,
+        trigger_label: str,
+        updated_since: str | None,
+        skip_labels: Iterable[str] = (),
+    ) -> str:
+        query = f"is:issue is:open {cls._label_term(trigger_label)} sort:updated-desc"
+        for label in skip_labels:
+            query += f" -{cls._label_term(label)}"
+        if updated_since:
+            query += f" updated:>={updated_since}"
+        return query
+
+    def list_open_issues(
+        self,
+        trigger_label: str,
+        limit: int = 100,
+        updated_since: str | None = None,
+        skip_labels: Iterable[str] = (),
+    ) -> list[dict[str, Any]]:
+        args = self._list_open_issues_args(trigger_label, limit, updated_since, skip_labels)
+        data = self._call("list", lambda: self.gh_json(args))
         if not isinstance(data, list):
             return []
         return data
 
-    def view_issue(self, issue_id: int) -> dict[str, Any]:
-        data = self.gh_json(
-            [
-                "issue",
-                "view",
-                str(issue_id),
-                "--json",
-                "number,title,body,url,labels,updatedAt,state",
+    @classmethod
+    def _list_open_issues_args(
+        cls,
+        trigger_label: str,
+        limit: int,
+        updated_since: str | None,
+        skip_labels: Iterable[str] = (),
+    ) -> list[str]:
+        return [
+            "issue",
+            "list",
+            "--search",
+            cls._open_issues_query(trigger_label, updated_since, skip_labels),
+            "--limit",
+            str(limit),
+            "--json",
+            "number,title,updatedAt,createdAt,url,labels",
+        ]
+
+    def iter_open_issue_pages(
+        self,
+        trigger_label: str,
+        page_size: int = 100,
+        updated_since: str | None = None,
+        skip_labels: Iterable[str] = (),
+    ) -> Iterator[list[dict[str, Any]]]:
+        # The search API stops paginating after 1000 results; the REST-backed
+        # HttpGhClient override has no such cap.
+        query = self._open_issues_query(trigger_label, updated_since, skip_labels)
+        after: str | None = None
+        while True:
+            variables = {"first": max(1, min(page_size, 100)), "after": after}
+            data = self._call(
+                "list",
+                lambda: self._graphql(
+                    _ISSUE_SEARCH_QUERY,
+                    variables,
+                    ["-F", f"q=repo:{{owner}}/{{repo}} {query}"],
+                ),
+            )
+            search = data.get("search") or {}
+            yield [
+                self._issue_from_graphql(node)
+                for node in search.get("nodes", [])
+                if isinstance(node, dict) and node.get("number") is not None
             ]
+            page_info = search.get("pageInfo") or {}
+            after = page_info.get("endCursor")
+            if not page_info.get("hasNextPage") or not after:
+                return
+
+    def view_issue(self, issue_id: int) -> dict[str, Any]:
+        return self._checked_issue(
+            issue_id,
+            self._call("view", lambda: self.gh_json(self._view_issue_args(issue_id))),
         )
+
+    @staticmethod
+    def _view_issue_args(issue_id: int) -> list[str]:
+        return [
+            "issue",
+            "view",
+            str(issue_id),
+            "--json",
+            "number,title,body,url,labels,updatedAt,state",
+        ]
+
+    @staticmethod
+    def _checked_issue(issue_id: int, data: Any) -> dict[str, Any]:
         if not isinstance(data, dict):
             raise GhError(["issue", "view", str(issue_id)], 1, str(data), "Unexpected issue payload")
         return data
 
+    def view_issues(self, issue_ids: Iterable[int]) -> dict[int, dict[str, Any]]:
+        numbers = sorted({int(issue_id) for issue_id in issue_ids})
+        details: dict[int, dict[str, Any]] = {}
+        for start in range(0, len(numbers), _ISSUE_BATCH_SIZE):
+            chunk = numbers[start : start + _ISSUE_BATCH_SIZE]
+            fields = " ".join(
+                f"issue{number}: issue(number: {number}) {{ {_ISSUE_DETAIL_FIELDS} }}"
+                for number in chunk
+            )
+            query = (
+                "query($owner: String!, $name: String!) { "
+                f"repository(owner: $owner, name: $name) {{ {fields} }} }}"
+            )
+            data = self._call("view", lambda: self.repo_graphql(query))
+            repository = data.get("repository") or {}
+            for number in chunk:
+                node = repository.get(f"issue{number}")
+                if isinstance(node, dict):
+                    details[number] = self._issue_from_graphql(node)
+        return details
+
     def list_open_pr_for_branch(self, branch: str) -> list[dict[str, Any]]:
-        data = self.gh_json(
-            [
-                "pr",
-                "list",
-                "--head",
-                branch,
-                "--state",
-                "open",
-                "--json",
-                "number,url",
-            ]
-        )
+        data = self._call("pr", lambda: self.gh_json(self._list_open_pr_args(branch)))
         if not isinstance(data, list):
             return []
         return data
 
+    @staticmethod
+    def _list_open_pr_args(branch: str) -> list[str]:
+        return [
+            "pr",
+            "list",
+            "--head",
+            branch,
+            "--state",
+            "open",
+            "--json",
+            "number,url",
+        ]
+
+    def list_open_prs_by_head(self, prefix: str) -> dict[str, dict[str, Any]]:
+        return self._prs_by_head(prefix, self._call("pr", lambda: self.gh_json(self._list_open_prs_args(prefix))))
+
+    @staticmethod
+    def _list_open_prs_args(prefix: str) -> list[str]:
+        # head: matches branch names starting with the prefix, so only our PRs
+        # count against the search cap.
+        return [
+            "pr",
+            "list",
+            "--state",
+            "open",
+            "--search",
+            f"head:{prefix.rstrip('/')}",
+            "--limit",
+            "1000",
+            "--json",
+            "number,url,headRefName",
+        ]
+
+    @staticmethod
+    def _prs_by_head(prefix: str, data: Any) -> dict[str, dict[str, Any]]:
+        if not isinstance(data, list):
+            return {}
+        return {
+            str(pr["headRefName"]): pr
+            for pr in data
+            if isinstance(pr, dict) and str(pr.get("headRefName", "")).startswith(prefix)
+        }
+
     def create_pr(
         self,
         branch: str,
@@ -112,7 +386,31 @@ class GhClient:
         title: str,
         body: str,
         draft: bool,
-    ) -> str:
+    ) -> dict[str, Any]:
+        out = self._call(
+            "pr",
+            lambda: self.gh_text(self._create_pr_args(branch, base_branch, title, body, draft)),
+            idempotent=False,
+        ).strip()
+        return self._created_pr(branch, out)
+
+    @classmethod
+    def _created_pr(cls, branch: str, out: str) -> dict[str, Any]:
+        url = out.splitlines()[-1].strip() if out else ""
+        return {
+            "number": cls.parse_pr_number_from_url(url),
+            "url": url or None,
+            "headRefName": branch,
+        }
+
+    @staticmethod
+    def _create_pr_args(
+        branch: str,
+        base_branch: str,
+        title: str,
+        body: str,
+        draft: bool,
+    ) -> list[str]:
         args = [
             "pr",
             "create",
@@ -127,19 +425,34 @@ class GhClient:
         ]
         if draft:
             args.append("--draft")
-        out = self.gh_text(args).strip()
-        return out
+        return args
 
     def comment_issue(self, issue_id: int, body: str) -> None:
-        self.gh_text(
-            [
-                "issue",
-                "comment",
-                str(issue_id),
-                "--body",
-                body,
-            ]
-        )
+        self._call("comment", lambda: self.gh_text(self._comment_issue_args(issue_id, body)), idempotent=False)
+
+    def issue_comment_bodies(self, issue_id: int) -> list[str]:
+        out = self._call("view", lambda: self.gh_text(self._issue_comments_args(issue_id)))
+        return [str(json.loads(line)) for line in out.splitlines() if line.strip()]
+
+    @staticmethod
+    def _issue_comments_args(issue_id: int) -> list[str]:
+        return [
+            "api",
+            "--paginate",
+            f"repos/{{owner}}/{{repo}}/issues/{issue_id}/comments?per_page=100",
+            "--jq",
+            ".[] | .body | @json",
+        ]
+
+    @staticmethod
+    def _comment_issue_args(issue_id: int, body: str) -> list[str]:
+        return [
+            "issue",
+            "comment",
+            str(issue_id),
+            "--body",
+            body,
+        ]
 
     @staticmethod
     def parse_pr_number_from_url(url: str | None) -> int | None:
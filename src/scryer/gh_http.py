@@ -0,0 +1,507 @@
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+from urllib.parse import urlencode, urlsplit
+
+from . import __version__
+from .db import Database
+from .gh import GhClient, GhError
+from .resilience import ResiliencePolicy
+
+_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+_NEXT_LINK_RE = re.compile(r'<([^>]+)>\s*;\s*rel="next"')
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+def next_page_path(link_header: str | None) -> str | None:
+    if not link_header:
+        return None
+    match = _NEXT_LINK_RE.search(link_header)
+    if not match:
+        return None
+    parsed = urlsplit(match.group(1))
+    return f"{parsed.path}?{parsed.query}" if parsed.query else parsed.path
+
+
+def default_api_url(host: str) -> str:
+    if host.lower() in {"github.com", "api.github.com"}:
+        return "https://api.github.com"
+    return f"https://{host}/api/v3"
+
+
+def resolve_gh_token(host: str, repo_root: Path | None = None) -> str:
+    if host.lower() == "github.com":
+        env_names = ["GH_TOKEN", "GITHUB_TOKEN"]
+    else:
+        env_names = ["GH_ENTERPRISE_TOKEN", "GITHUB_ENTERPRISE_TOKEN"]
+    for name in env_names:
+        value = os.environ.get(name, "").strip()
+        if value:
+            return value
+
+    cmd = ["gh", "auth", "token", "--hostname", host]
+    try:
+        proc = subprocess.run(
+            cmd,
+            cwd=repo_root,
+            text=True,
+            capture_output=True,
+            check=False,
+        )
+    except FileNotFoundError as exc:
+        raise GhError(cmd, 127, "", f"gh not found and no token in {'/'.join(env_names)}") from exc
+    token = (proc.stdout or "").strip()
+    if proc.returncode != 0 or not token:
+        raise GhError(cmd, proc.returncode or 1, proc.stdout or "", proc.stderr or "no token")
+    return token
+
+
+@dataclass(slots=True)
+class HttpResponse:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        if not self.body.strip():
+            return None
+        return json.loads(self.body)
+
+
+class _ConnectionPool:
+    def __init__(self, scheme: str, host: str, port: int | None, size: int, timeout: float):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._idle: queue.LifoQueue[http.client.HTTPConnection] = queue.LifoQueue(maxsize=max(1, size))
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _new(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self) -> Iterator[tuple[http.client.HTTPConnection, bool]]:
+        try:
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._new(), False
+        try:
+            yield conn, reused
+        except BaseException:
+            conn.close()
+            raise
+        with self._lock:
+            if self._closed:
+                conn.close()
+                return
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class HttpGhClient(GhClient):
+    listing_cap = None
+
+    def __init__(
+        self,
+        repo_root: Path,
+        owner: str,
+        repo: str,
+        token: str,
+        api_url: str = "https://api.github.com",
+        pool_size: int = 4,
+        timeout: float = 30.0,
+        cache: Database | None = None,
+        policy: ResiliencePolicy | None = None,
+    ):
+        super().__init__(repo_root, policy)
+        self.owner = owner
+        self.repo = repo
+        self._token = token
+        self._cache = cache
+        self._cache_lock = threading.Lock()
+        if cache is not None:
+            with self._cache_lock:
+                cache.prune_http_cache(_CACHE_MAX_AGE_SECONDS)
+        parsed = urlsplit(api_url.rstrip("/"))
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise ValueError(f"Unsupported GitHub API URL: {api_url}")
+        self._base_path = parsed.path
+        if self._base_path.endswith("/v3"):
+            self._graphql_path = self._base_path[: -len("v3")] + "graphql"
+        else:
+            self._graphql_path = f"{self._base_path}/graphql"
+        self._pool = _ConnectionPool(parsed.scheme, parsed.hostname, parsed.port, pool_size, timeout)
+
+    @classmethod
+    def from_repo(
+        cls,
+        repo_root: Path,
+        host: str,
+        owner: str,
+        repo: str,
+        api_url: str | None = None,
+        pool_size: int = 4,
+        cache: Database | None = None,
+        policy: ResiliencePolicy | None = None,
+    ) -> HttpGhClient:
+        return cls(
+            repo_root=repo_root,
+            owner=owner,
+            repo=repo,
+            token=resolve_gh_token(host, repo_root),
+            api_url=api_url or default_api_url(host),
+            pool_size=pool_size,
+            cache=cache,
+            policy=policy,
+        )
+
+    def close(self) -> None:
+        self._pool.close()
+        if self._cache is not None:
+            with self._cache_lock:
+                self._cache.close()
+
+    @property
+    def _repo_path(self) -> str:
+        return f"{self._base_path}/repos/{self.owner}/{self.repo}"
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, object] | None = None,
+        payload: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> HttpResponse:
+        url = path
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        request_headers = {
+            "Accept": "application/vnd.github+json",
+            "Authorization": f"Bearer {self._token}",
+            "User-Agent": f"scryer/{__version__}",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+        if body is not None:
+            request_headers["Content-Type"] = "application/json"
+        if headers:
+            request_headers.update(headers)
+
+        # A non-idempotent request may have reached GitHub before the connection
+        # dropped, so only safe methods are replayed on a fresh connection.
+        retry_stale = method in {"GET", "HEAD"}
+        while True:
+            with self._pool.connection() as (conn, reused):
+                try:
+                    conn.request(method, url, body=body, headers=request_headers)
+                    resp = conn.getresponse()
+                    data = resp.read()
+                except (*_STALE_CONNECTION_ERRORS, OSError) as exc:
+                    conn.close()
+                    if reused and retry_stale and isinstance(exc, _STALE_CONNECTION_ERRORS):
+                        retry_stale = False
+                        continue
+                    raise GhError([method, url], 0, "", f"network error: {exc}", network=True) from exc
+                if resp.will_close:
+                    conn.close()
+            response = HttpResponse(
+                status=resp.status,
+                headers={key.lower(): value for key, value in resp.getheaders()},
+                body=data,
+            )
+            self.rate_limit.update_from_headers(response.headers)
+            if response.status != 304 and not path.endswith("/rate_limit"):
+                self.rate_limit.record_call()
+            return response
+
+    def _rate_limit_payload(self) -> Any:
+        return self._request_json("GET", f"{self._base_path}/rate_limit")
+
+    def _get(self, path: str, params: dict[str, object] | None = None) -> HttpResponse:
+        if self._cache is None:
+            return self._request("GET", path, params=params)
+        request_key = f"{path}?{urlencode(params)}" if params else path
+        with self._cache_lock:
+            cached = self._cache.get_cached_response(request_key)
+        headers: dict[str, str] = {}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        elif cached is not None and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+        resp = self._request("GET", path, params=params, headers=headers)
+        if resp.status == 304 and cached is not None:
+            with self._cache_lock:
+                self._cache.record_cache_hit(request_key)
+            response_headers = dict(resp.headers)
+            if cached.link:
+                response_headers["link"] = cached.link
+            return HttpResponse(status=200, headers=response_headers, body=cached.body)
+
+        etag = resp.headers.get("etag")
+        last_modified = resp.headers.get("last-modified")
+        if resp.status == 200 and (etag or last_modified):
+            with self._cache_lock:
+                self._cache.store_cached_response(
+                    request_key,
+                    etag=etag,
+                    last_modified=last_modified,
+                    link=resp.headers.get("link"),
+                    body=resp.body,
+                )
+        return resp
+
+    def _get_json(self, path: str, params: dict[str, object] | None = None) -> Any:
+        return self._decode_json("GET", path, self._get(path, params))
+
+    def _request_json(self, method: str, path: str, **kwargs: Any) -> Any:
+        return self._decode_json(method, path, self._request(method, path, **kwargs))
+
+    @staticmethod
+    def _decode_json(method: str, path: str, resp: HttpResponse) -> Any:
+        text = resp.body.decode("utf-8", errors="replace")
+        if resp.status >= 400:
+            message = text
+            try:
+                parsed = json.loads(text)
+                if isinstance(parsed, dict) and parsed.get("message"):
+                    message = str(parsed["message"])
+            except json.JSONDecodeError:
+                pass
+            raise GhError([method, path], resp.status, text, message)
+        try:
+            return resp.json()
+        except json.JSONDecodeError as exc:
+            raise GhError([method, path], resp.status, text, f"Invalid JSON from GitHub: {exc}") from exc
+
+    def graphql(self, query: str, variables: dict[str, object] | None = None) -> dict[str, Any]:
+        data = self._request_json(
+            "POST",
+            self._graphql_path,
+            payload={"query": query, "variables": variables or {}},
+        )
+        if not isinstance(data, dict):
+            raise GhError(["POST", self._graphql_path], 1, str(data), "Unexpected GraphQL payload")
+        if data.get("errors"):
+            raise GhError(["POST", self._graphql_path], 1, json.dumps(data), json.dumps(data["errors"]))
+        return data.get("data") or {}
+
+    def repo_graphql(self, query: str, variables: dict[str, object] | None = None) -> dict[str, Any]:
+        return self.graphql(query, {"owner": self.owner, "name": self.repo, **(variables or {})})
+
+    @staticmethod
+    def _issue_from_rest(item: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "number": item.get("number"),
+            "title": item.get("title"),
+            "body": item.get("body"),
+            "url": item.get("html_url"),
+            "labels": [
+                {"name": label.get("name")}
+                for label in item.get("labels", [])
+                if isinstance(label, dict)
+            ],
+            "state": str(item.get("state", "")).upper(),
+            "createdAt": item.get("created_at"),
+            "updatedAt": item.get("updated_at"),
+        }
+
+    @staticmethod
+    def _open_issues_from_rest(data: list[Any], skip_labels: Iterable[str]) -> list[dict[str, Any]]:
+        # The REST issues endpoint has no label exclusion, so skip labels are
+        # filtered here rather than in the request.
+        skip = set(skip_labels)
+        issues = [
+            HttpGhClient._issue_from_rest(item)
+            for item in data
+            if isinstance(item, dict) and "pull_request" not in item
+        ]
+        return [
+            issue
+            for issue in issues
+            if not any(label["name"] in skip for label in issue["labels"])
+        ]
+
+    def list_open_issues(
+        self,
+        trigger_label: str,
+        limit: int = 100,
+        updated_since: str | None = None,
+        skip_labels: Iterable[str] = (),
+    ) -> list[dict[str, Any]]:
+        params: dict[str, object] = {
+            "state": "open",
+            "labels": trigger_label,
+            "sort": "updated",
+            "direction": "desc",
+            "per_page": max(1, min(limit, 100)),
+        }
+        if updated_since:
+            params["since"] = updated_since
+        data = self._call("list", lambda: self._get_json(f"{self._repo_path}/issues", params))
+        if not isinstance(data, list):
+            return []
+        return self._open_issues_from_rest(data, skip_labels)
+
+    def iter_open_issue_pages(
+        self,
+        trigger_label: str,
+        page_size: int = 100,
+        updated_since: str | None = None,
+        skip_labels: Iterable[str] = (),
+    ) -> Iterator[list[dict[str, Any]]]:
+        params: dict[str, object] | None = {
+            "state": "open",
+            "labels": trigger_label,
+            "sort": "updated",
+            "direction": "desc",
+            "per_page": max(1, min(page_size, 100)),
+        }
+        if updated_since:
+            params["since"] = updated_since
+        path: str | None = f"{self._repo_path}/issues"
+        while path:
+            page_path, page_params = path, params
+            resp = self._call("list", lambda: self._get(page_path, page_params))
+            data = self._decode_json("GET", path, resp)
+            if not isinstance(data, list):
+                return
+            yield self._open_issues_from_rest(data, skip_labels)
+            path = next_page_path(resp.headers.get("link"))
+            params = None
+
+    def view_issue(self, issue_id: int) -> dict[str, Any]:
+        data = self._call("view", lambda: self._get_json(f"{self._repo_path}/issues/{issue_id}"))
+        if not isinstance(data, dict):
+            raise GhError(["GET", f"issues/{issue_id}"], 1, str(data), "Unexpected issue payload")
+        return self._issue_from_rest(data)
+
+    def list_open_pr_for_branch(self, branch: str) -> list[dict[str, Any]]:
+        data = self._call(
+            "pr",
+            lambda: self._get_json(
+                f"{self._repo_path}/pulls",
+                {"state": "open", "head": f"{self.owner}:{branch}"},
+            ),
+        )
+        if not isinstance(data, list):
+            return []
+        return [
+            {"number": item.get("number"), "url": item.get("html_url")}
+            for item in data
+            if isinstance(item, dict)
+        ]
+
+    def list_open_prs_by_head(self, prefix: str) -> dict[str, dict[str, Any]]:
+        prs: dict[str, dict[str, Any]] = {}
+        params: dict[str, object] | None = {"state": "open", "per_page": 100}
+        path: str | None = f"{self._repo_path}/pulls"
+        while path:
+            page_path, page_params = path, params
+            resp = self._call("pr", lambda: self._get(page_path, page_params))
+            data = self._decode_json("GET", path, resp)
+            if not isinstance(data, list):
+                break
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                pr = self._pr_from_rest(item)
+                if pr["headRefName"].startswith(prefix):
+                    prs[pr["headRefName"]] = pr
+            path = next_page_path(resp.headers.get("link"))
+            params = None
+        return prs
+
+    @staticmethod
+    def _pr_from_rest(item: dict[str, Any]) -> dict[str, Any]:
+        head = item.get("head") or {}
+        return {
+            "number": item.get("number"),
+            "url": item.get("html_url"),
+            "headRefName": str(head.get("ref", "")) if isinstance(head, dict) else "",
+        }
+
+    def create_pr(
+        self,
+        branch: str,
+        base_branch: str,
+        title: str,
+        body: str,
+        draft: bool,
+    ) -> dict[str, Any]:
+        data = self._call(
+            "pr",
+            lambda: self._request_json(
+                "POST",
+                f"{self._repo_path}/pulls",
+                payload={
+                    "head": branch,
+                    "base": base_branch,
+                    "title": title,
+                    "body": body,
+                    "draft": draft,
+                },
+            ),
+            idempotent=False,
+        )
+        if not isinstance(data, dict):
+            raise GhError(["POST", "pulls"], 1, str(data), "Unexpected pull request payload")
+        return self._pr_from_rest(data)
+
+    def issue_comment_bodies(self, issue_id: int) -> list[str]:
+        bodies: list[str] = []
+        params: dict[str, object] | None = {"per_page": 100}
+        path: str | None = f"{self._repo_path}/issues/{issue_id}/comments"
+        while path:
+            page_path, page_params = path, params
+            resp = self._call("view", lambda: self._get(page_path, page_params))
+            data = self._decode_json("GET", path, resp)
+            if not isinstance(data, list):
+                break
+            bodies.extend(str(item.get("body") or "") for item in data if isinstance(item, dict))
+            path = next_page_path(resp.headers.get("link"))
+            params = None
+        return bodies
+
+    def comment_issue(self, issue_id: int, body: str) -> None:
+        self._call(
+            "comment",
+            lambda: self._request_json(
+                "POST",
+                f"{self._repo_path}/issues/{issue_id}/comments",
+                payload={"body": body},
+            ),
+            idempotent=False,
+        )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
 
 @dataclass(slots=True)
@@ -20,16 +21,31 @@ class IssueRecord:
     completed_at: str | None
     last_error: str | None
     last_run_dir: str | None
+    details_updated_at: str | None = None
+    details_fetched_at: str | None = None
+    details_state: str | None = None
+
+
+@dataclass(slots=True)
+class RunMetrics:
+    started_at: str
+    finished_at: str | None = None
+    duration_seconds: float | None = None
+    stage_seconds: dict[str, float] = field(default_factory=dict)
+    cpu_user_seconds: float | None = None
+    cpu_system_seconds: float | None = None
+    peak_rss_kb: int | None = None
 
 
 @dataclass(slots=True)
 class RunnerResult:
-    status: str  # pushed|skipped|failed|timeout
+    status: str  # pushed|skipped|failed|timeout|cancelled
     branch: str
     run_dir: Path
     head_sha: str | None
     error: str | None
     exit_code: int | None
+    metrics: RunMetrics | None = None
 
 
 @dataclass(slots=True)
@@ -38,3 +54,36 @@ class PrInfo:
     url: str | None
     created: bool
 
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    etag: str | None
+    last_modified: str | None
+    link: str | None
+    body: bytes
+
+
+@dataclass(slots=True)
+class OutboxJob:
+    id: int
+    issue_id: int
+    kind: str  # create_pr|comment
+    dedupe_key: str
+    payload: dict[str, Any]
+    attempts: int
+
+
+@dataclass(slots=True)
+class DailyCounts:
+    day: str
+    done: int = 0
+    started: int = 0
+    failed: int = 0
+
+
+@dataclass(slots=True)
+class UpsertStats:
+    inserted: int = 0
+    changed: int = 0
+    unchanged: int = 0
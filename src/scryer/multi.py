@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from .config import Config
+from .daemon import CycleResult, DaemonService
+from .models import IssueRecord
+
+
+@dataclass(slots=True)
+class RepoShare:
+    service: DaemonService
+    weight: int
+    inflight: int = 0
+    started: int = 0
+
+    @property
+    def namespace(self) -> str:
+        return self.service.config.repo_namespace
+
+    def load(self, extra: int = 0) -> tuple[float, float]:
+        return (self.inflight + extra) / self.weight, self.started / self.weight
+
+
+def fair_share(repos: list[RepoShare], slots: int) -> dict[int, int]:
+    quotas = {index: 0 for index in range(len(repos))}
+    for _ in range(max(0, slots)):
+        index = min(quotas, key=lambda i: repos[i].load(quotas[i]))
+        quotas[index] += 1
+    return {index: quota for index, quota in quotas.items() if quota}
+
+
+class MultiRepoDaemon:
+    def __init__(self, config: Config, repos: list[RepoShare], wake_event: threading.Event):
+        self.config = config
+        self.repos = repos
+        self.log = logging.getLogger(__name__)
+        self._wake = wake_event
+        self._stop_requested = False
+
+    def install_signal_handlers(self) -> None:
+        def _handler(signum: int, _frame) -> None:
+            self.log.info("signal received signum=%s stop_requested=true", signum)
+            self.request_stop()
+
+        signal.signal(signal.SIGINT, _handler)
+        signal.signal(signal.SIGTERM, _handler)
+
+    def request_stop(self) -> None:
+        self._stop_requested = True
+        for repo in self.repos:
+            repo.service.request_stop()
+        self._wake.set()
+
+    def run_forever(self) -> None:
+        self.install_signal_handlers()
+        workers = max(1, self.config.max_concurrent)
+        self.log.info(
+            "multi-repo daemon started repos=%s max_concurrent=%s weights=%s",
+            len(self.repos),
+            workers,
+            ",".join(f"{repo.namespace}:{repo.weight}" for repo in self.repos),
+        )
+        background_threads = [
+            threading.Thread(
+                target=target,
+                name=f"scryer-{role}-{repo.namespace}",
+                daemon=True,
+            )
+            for repo in self.repos
+            for role, target in (("poller", repo.service.poll_loop), ("outbox", repo.service.outbox_loop))
+        ]
+        for thread in background_threads:
+            thread.start()
+
+        inflight: dict[Future[CycleResult], tuple[RepoShare, IssueRecord]] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scryer-worker") as executor:
+            while not self._stop_requested:
+                for future in [future for future in inflight if future.done()]:
+                    repo, issue = inflight.pop(future)
+                    repo.inflight -= 1
+                    repo.service.collect_result(future, issue)
+                try:
+                    self._dispatch(executor, inflight, workers)
+                except Exception:
+                    self.log.exception("unexpected dispatch error")
+                if self._wake.wait(timeout=self._wait_seconds()):
+                    self._wake.clear()
+            if inflight:
+                self.log.info("waiting for in-flight workers count=%s", len(inflight))
+
+        for future, (repo, issue) in inflight.items():
+            repo.service.collect_result(future, issue)
+        for thread in background_threads:
+            thread.join(timeout=30)
+        for repo in self.repos:
+            repo.service.db.remove_daemon_heartbeat(repo.service.config.worker_id)
+        self.log.info("multi-repo daemon stopped")
+
+    def _wait_seconds(self) -> float:
+        wait_seconds = float(self.config.poll_interval_seconds)
+        paused = [repo.service.dispatch_paused_for() for repo in self.repos]
+        resuming = [seconds for seconds in paused if seconds > 0]
+        if resuming:
+            wait_seconds = min(wait_seconds, min(resuming))
+        return wait_seconds
+
+    def _dispatch(
+        self,
+        executor: ThreadPoolExecutor,
+        inflight: dict[Future[CycleResult], tuple[RepoShare, IssueRecord]],
+        workers: int,
+    ) -> None:
+        started = time.monotonic()
+        for repo in self.repos:
+            repo.service.prepare_dispatch()
+
+        candidates = [repo for repo in self.repos if repo.service.dispatch_paused_for() <= 0]
+        dispatched: dict[str, list[int]] = {}
+        free_slots = workers - len(inflight)
+        while free_slots > 0 and candidates:
+            for index, quota in fair_share(candidates, free_slots).items():
+                repo = candidates[index]
+                submitted = repo.service.submit_claims(executor, quota, repo.inflight)
+                for future, issue in submitted.items():
+                    inflight[future] = (repo, issue)
+                    dispatched.setdefault(repo.namespace, []).append(issue.id)
+                repo.inflight += len(submitted)
+                repo.started += len(submitted)
+                free_slots -= len(submitted)
+                if len(submitted) < quota:
+                    candidates = [candidate for candidate in candidates if candidate is not repo]
+                    break
+
+        if dispatched:
+            self.log.info(
+                "dispatched issues count=%s inflight=%s dispatch_latency_ms=%s issues=%s",
+                sum(len(ids) for ids in dispatched.values()),
+                len(inflight),
+                int((time.monotonic() - started) * 1000),
+                " ".join(
+                    f"{namespace}:{','.join(str(issue_id) for issue_id in ids)}"
+                    for namespace, ids in dispatched.items()
+                ),
+            )
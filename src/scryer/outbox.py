@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import logging
+import random
+
+from .config import Config
+from .db import Database
+from .gh import GhClient, GhError
+from .models import OutboxJob
+from .pr import PRManager
+
+_DRAIN_BATCH = 20
+_JOB_LEASE_SECONDS = 300
+_BASE_BACKOFF_SECONDS = 30
+
+
+class OutboxDrainer:
+    def __init__(self, config: Config, db: Database, gh: GhClient, pr_manager: PRManager):
+        self.config = config
+        self.db = db
+        self.gh = gh
+        self.pr_manager = pr_manager
+        self.log = logging.getLogger(__name__)
+
+    def drain(self, limit: int = _DRAIN_BATCH) -> int:
+        jobs = self.db.claim_outbox_jobs(limit, lease_seconds=_JOB_LEASE_SECONDS)
+        completed = 0
+        for job in jobs:
+            try:
+                self._dispatch(job)
+            except Exception as exc:
+                permanent = isinstance(exc, GhError) and exc.permanent
+                if permanent or job.attempts >= max(1, self.config.outbox_max_attempts):
+                    self.db.dead_letter_outbox_job(job.id, job.issue_id, job.kind, str(exc))
+                    self.log.error(
+                        "outbox job dead id=%s kind=%s issue=%s attempt=%s permanent=%s error=%s",
+                        job.id,
+                        job.kind,
+                        job.issue_id,
+                        job.attempts,
+                        permanent,
+                        exc,
+                    )
+                    continue
+                delay = self._backoff_seconds(job.attempts)
+                self.db.reschedule_outbox_job(job.id, delay, str(exc))
+                self.log.warning(
+                    "outbox job failed id=%s kind=%s issue=%s attempt=%s retry_in_seconds=%s error=%s",
+                    job.id,
+                    job.kind,
+                    job.issue_id,
+                    job.attempts,
+                    delay,
+                    exc,
+                )
+                continue
+            completed += 1
+        if jobs:
+            self.log.info("outbox drained claimed=%s completed=%s", len(jobs), completed)
+        return completed
+
+    def _backoff_seconds(self, attempts: int) -> int:
+        ceiling = min(
+            self.config.outbox_max_backoff_seconds,
+            _BASE_BACKOFF_SECONDS * 2 ** max(0, min(attempts - 1, 16)),
+        )
+        return max(1, int(ceiling * random.uniform(0.5, 1.0)))
+
+    def _dispatch(self, job: OutboxJob) -> None:
+        if job.kind == "create_pr":
+            pr = self.pr_manager.ensure_pr(job.payload)
+            comment_job = None
+            if self.config.issue_comment_on_success and pr.url:
+                comment_job = {
+                    "issue_number": job.issue_id,
+                    "body": f"Opened PR for this issue: {pr.url}",
+                }
+            self.db.mark_pr_opened(job.id, job.issue_id, pr.number, pr.url, comment_job)
+            self.log.info("issue complete id=%s pr=%s", job.issue_id, pr.url)
+            return
+        if job.kind == "comment":
+            issue_number = int(job.payload["issue_number"])
+            marker = f"<!-- scryer:{job.dedupe_key} -->"
+            # A previous attempt may have posted before failing to record completion.
+            if job.attempts > 1 and any(marker in body for body in self.gh.issue_comment_bodies(issue_number)):
+                self.db.complete_outbox_job(job.id)
+                self.log.info("issue comment already posted issue=%s", job.issue_id)
+                return
+            self.gh.comment_issue(issue_number, f"{job.payload['body']}\n\n{marker}")
+            self.db.complete_outbox_job(job.id)
+            self.log.info("posted issue comment issue=%s", job.issue_id)
+            return
+        raise ValueError(f"Unknown outbox job kind: {job.kind!r}")
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import logging
+from datetime import datetime, timezone
 
 from .config import Config
-from .db import Database
-from .gh import GhClient
+from .db import Database, utcnow_iso
+from .gh import GhClient, GhError
+from .models import UpsertStats
+
+_POLL_PAGE_SIZE = 100
+_CANCEL_REASON = "issue closed or no longer eligible"
 
 
 class Poller:
@@ -14,27 +19,140 @@ class Poller:
         self.gh = gh
         self.log = logging.getLogger(__name__)
 
+    @property
+    def _watermark_key(self) -> str:
+        return f"poll_watermark:{self.config.trigger_label}"
+
+    @property
+    def _full_sync_key(self) -> str:
+        return f"poll_last_full_sync:{self.config.trigger_label}"
+
+    def _full_resync_due(self) -> bool:
+        if self.config.poll_full_resync_seconds <= 0:
+            return True
+        last_full_sync = self.db.get_meta(self._full_sync_key)
+        if not last_full_sync:
+            return True
+        try:
+            last = datetime.fromisoformat(last_full_sync)
+        except ValueError:
+            return True
+        age = (datetime.now(timezone.utc) - last).total_seconds()
+        return age >= self.config.poll_full_resync_seconds
+
     def poll_and_upsert(self) -> int:
-        raw_issues = self.gh.list_open_issues(self.config.trigger_label, limit=100)
-        payload: list[dict[str, object]] = []
-        for issue in raw_issues:
-            labels = [
+        watermark = None if self._full_resync_due() else self.db.get_meta(self._watermark_key)
+        started_at = utcnow_iso()
+        fetched = 0
+        pages = 0
+        totals = UpsertStats()
+        newest: str | None = None
+        seen: set[int] = set()
+        for raw_issues in self.gh.iter_open_issue_pages(
+            self.config.trigger_label,
+            page_size=_POLL_PAGE_SIZE,
+            updated_since=watermark,
+            skip_labels=self.config.skip_labels,
+        ):
+            payload = [self._issue_payload(issue) for issue in raw_issues]
+            if not payload:
+                continue
+            stats = self.db.upsert_polled_issues(payload)
+            totals.inserted += stats.inserted
+            totals.changed += stats.changed
+            totals.unchanged += stats.unchanged
+            pages += 1
+            fetched += len(payload)
+            seen.update(int(issue["id"]) for issue in payload)
+            for issue in payload:
+                updated_at = issue.get("updated_at")
+                if updated_at and (newest is None or str(updated_at) > newest):
+                    newest = str(updated_at)
+
+        if watermark is None:
+            self.db.set_meta(self._full_sync_key, started_at)
+            cancelled = self._cancel_missing(seen, fetched)
+        else:
+            cancelled = self._cancel_ineligible_running()
+        if newest is not None and (watermark is None or newest > watermark):
+            self.db.set_meta(self._watermark_key, newest)
+        self.log.info(
+            "poll complete mode=%s fetched=%s pages=%s inserted=%s changed=%s unchanged=%s cancelled=%s watermark=%s",
+            "full" if watermark is None else "incremental",
+            fetched,
+            pages,
+            totals.inserted,
+            totals.changed,
+            totals.unchanged,
+            len(cancelled),
+            watermark,
+        )
+        return fetched
+
+    def _cancel_missing(self, open_ids: set[int], fetched: int) -> list[int]:
+        cap = self.gh.listing_cap
+        if cap is not None and fetched >= cap:
+            self.log.warning("open-set reconciliation skipped fetched=%s listing_cap=%s", fetched, cap)
+            return []
+        cancelled = self.db.cancel_missing_issues(open_ids, _CANCEL_REASON)
+        if cancelled:
+            self.log.info(
+                "cancelled vanished issues count=%s issue_ids=%s",
+                len(cancelled),
+                ",".join(str(issue_id) for issue_id in cancelled),
+            )
+        return cancelled
+
+    def _cancel_ineligible_running(self) -> list[int]:
+        # Incremental polls only see issues that are still open and labelled,
+        # so running issues are checked directly.
+        running = self.db.list_issue_ids("running")
+        if not running:
+            return []
+        try:
+            details = self.gh.view_issues(running)
+        except GhError as exc:
+            self.log.warning("running issue check failed count=%s error=%s", len(running), exc)
+            return []
+        skip = set(self.config.skip_labels)
+        ineligible = []
+        for issue_id in running:
+            issue = details.get(issue_id)
+            if issue is None:
+                # A missing node says nothing about the issue; check it next poll.
+                continue
+            labels = {
                 str(label.get("name"))
                 for label in issue.get("labels", [])
-                if isinstance(label, dict) and label.get("name")
-            ]
-            payload.append(
-                {
-                    "id": int(issue["number"]),
-                    "title": str(issue["title"]),
-                    "body": None,
-                    "url": issue.get("url"),
-                    "labels": labels,
-                    "updated_at": issue.get("updatedAt"),
-                }
+                if isinstance(label, dict)
+            }
+            if (
+                str(issue.get("state", "")).lower() != "open"
+                or self.config.trigger_label not in labels
+                or labels & skip
+            ):
+                ineligible.append(issue_id)
+        cancelled = self.db.cancel_issues(ineligible, _CANCEL_REASON)
+        if cancelled:
+            self.log.info(
+                "cancelled ineligible running issues count=%s issue_ids=%s",
+                len(cancelled),
+                ",".join(str(issue_id) for issue_id in cancelled),
             )
+        return cancelled
 
-        self.db.upsert_polled_issues(payload)
-        self.log.info("poll complete fetched=%s", len(payload))
-        return len(payload)
-
+    @staticmethod
+    def _issue_payload(issue: dict[str, object]) -> dict[str, object]:
+        labels = [
+            str(label.get("name"))
+            for label in issue.get("labels", [])
+            if isinstance(label, dict) and label.get("name")
+        ]
+        return {
+            "id": int(issue["number"]),
+            "title": str(issue["title"]),
+            "body": None,
+            "url": issue.get("url"),
+            "labels": labels,
+            "updated_at": issue.get("updatedAt"),
+        }
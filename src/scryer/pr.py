@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import logging
+import threading
+from typing import Any
 
 from .config import Config
-from .gh import GhClient
+from .gh import GhClient, GhError
 from .models import PrInfo, RunnerResult
 
 
@@ -12,57 +14,90 @@ class PRManager:
         self.config = config
         self.gh = gh
         self.log = logging.getLogger(__name__)
+        self._pr_index: dict[str, dict[str, Any]] | None = None
+        self._index_lock = threading.Lock()
 
-    def ensure_pr(self, issue: dict[str, object], result: RunnerResult) -> PrInfo:
-        branch = result.branch
-        existing = self.gh.list_open_pr_for_branch(branch)
+    def begin_cycle(self) -> None:
+        with self._index_lock:
+            self._pr_index = None
+
+    def _open_pr(self, branch: str) -> dict[str, Any] | None:
+        with self._index_lock:
+            if self._pr_index is None:
+                prefix = f"{self.config.branch_prefix}/"
+                self._pr_index = self.gh.list_open_prs_by_head(prefix)
+                self.log.info("loaded open pr index prefix=%s count=%s", prefix, len(self._pr_index))
+            return self._pr_index.get(branch)
+
+    def _remember_pr(self, branch: str, pr: dict[str, Any]) -> None:
+        with self._index_lock:
+            if self._pr_index is not None:
+                self._pr_index[branch] = pr
+
+    def pr_job(self, issue: dict[str, object], result: RunnerResult) -> dict[str, object]:
+        return {
+            "issue_number": int(issue["number"]),
+            "branch": result.branch,
+            "base_branch": self.config.base_branch,
+            "title": f"[Codex] {str(issue.get('title', '')).strip()}",
+            "body": self._build_pr_body(issue),
+            "draft": self.config.draft_pr,
+        }
+
+    def ensure_pr(self, job: dict[str, Any]) -> PrInfo:
+        branch = str(job["branch"])
+        existing = self._open_pr(branch)
         if existing:
-            first = existing[0]
             self.log.info(
                 "pr already open branch=%s pr=%s",
                 branch,
-                first.get("url"),
+                existing.get("url"),
             )
             return PrInfo(
-                number=int(first.get("number")),
-                url=str(first.get("url")),
+                number=int(existing.get("number")),
+                url=str(existing.get("url")),
                 created=False,
             )
 
-        title = f"[Codex] {str(issue.get('title', '')).strip()}"
-        body = self._build_pr_body(issue)
         self.log.info(
             "creating pr branch=%s base=%s draft=%s",
             branch,
-            self.config.base_branch,
-            self.config.draft_pr,
-        )
-        create_out = self.gh.create_pr(
-            branch=branch,
-            base_branch=self.config.base_branch,
-            title=title,
-            body=body,
-            draft=self.config.draft_pr,
+            job["base_branch"],
+            job["draft"],
         )
-        refreshed = self.gh.list_open_pr_for_branch(branch)
-        if refreshed:
-            first = refreshed[0]
-            pr_number = int(first.get("number"))
-            pr_url = str(first.get("url"))
-        else:
-            pr_number = self.gh.parse_pr_number_from_url(create_out)
-            pr_url = create_out or None
-
-        if self.config.issue_comment_on_success and pr_url:
-            self.gh.comment_issue(
-                int(issue["number"]),
-                f"Opened PR for this issue: {pr_url}",
+        try:
+            created = self.gh.create_pr(
+                branch=branch,
+                base_branch=str(job["base_branch"]),
+                title=str(job["title"]),
+                body=str(job["body"]),
+                draft=bool(job["draft"]),
             )
-            self.log.info("posted issue comment issue=%s pr=%s", issue["number"], pr_url)
-
+        except GhError as exc:
+            # A PR opened by an earlier attempt, or one the index missed.
+            if "already exists" not in f"{exc.stderr}\n{exc.stdout}".lower():
+                raise
+            existing_prs = self.gh.list_open_pr_for_branch(branch)
+            if not existing_prs:
+                raise
+            existing = existing_prs[0]
+            self._remember_pr(branch, {**existing, "headRefName": branch})
+            self.log.info("pr already exists branch=%s pr=%s", branch, existing.get("url"))
+            return PrInfo(
+                number=int(existing["number"]) if existing.get("number") is not None else None,
+                url=str(existing.get("url")) if existing.get("url") else None,
+                created=False,
+            )
+        self._remember_pr(branch, created)
+        pr_number = created.get("number")
+        pr_url = created.get("url")
         self.log.info("pr ready branch=%s pr_number=%s pr_url=%s", branch, pr_number, pr_url)
 
-        return PrInfo(number=pr_number, url=pr_url, created=True)
+        return PrInfo(
+            number=int(pr_number) if pr_number is not None else None,
+            url=str(pr_url) if pr_url else None,
+            created=True,
+        )
 
     def _build_pr_body(self, issue: dict[str, object]) -> str:
         issue_id = int(issue["number"])
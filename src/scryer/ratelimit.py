@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping
+
+_TRACKED_RESOURCES = {"core", "graphql", "search"}
+_RESERVE_FRACTION = 0.1
+_SNAPSHOT_MAX_AGE_SECONDS = 300
+
+
+@dataclass(slots=True)
+class RateLimitSnapshot:
+    resource: str
+    limit: int
+    remaining: int
+    reset_at: float
+    observed_at: float
+
+    def seconds_until_reset(self, now: float | None = None) -> float:
+        return max(0.0, self.reset_at - (time.time() if now is None else now))
+
+
+@dataclass(slots=True)
+class PollPlan:
+    interval_seconds: int
+    resource: str | None
+    remaining: int | None
+    reset_in_seconds: int | None
+
+
+class RateLimitTracker:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshots: dict[str, RateLimitSnapshot] = {}
+        self._calls = 0
+
+    @property
+    def calls(self) -> int:
+        with self._lock:
+            return self._calls
+
+    def record_call(self) -> None:
+        with self._lock:
+            self._calls += 1
+
+    def update(self, resource: str, limit: int, remaining: int, reset_at: float) -> None:
+        if resource not in _TRACKED_RESOURCES or limit <= 0:
+            return
+        snapshot = RateLimitSnapshot(
+            resource=resource,
+            limit=limit,
+            remaining=max(0, remaining),
+            reset_at=reset_at,
+            observed_at=time.time(),
+        )
+        with self._lock:
+            self._snapshots[resource] = snapshot
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        try:
+            limit = int(headers["x-ratelimit-limit"])
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset_at = float(headers["x-ratelimit-reset"])
+        except (KeyError, ValueError):
+            return
+        self.update(headers.get("x-ratelimit-resource", "core"), limit, remaining, reset_at)
+
+    def update_from_payload(self, payload: Any) -> None:
+        if not isinstance(payload, dict):
+            return
+        resources = payload.get("resources")
+        if not isinstance(resources, dict):
+            return
+        for resource, values in resources.items():
+            if not isinstance(values, dict):
+                continue
+            try:
+                self.update(
+                    str(resource),
+                    int(values["limit"]),
+                    int(values["remaining"]),
+                    float(values["reset"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def snapshots(self, resources: Iterable[str] | None = None) -> list[RateLimitSnapshot]:
+        now = time.time()
+        wanted = None if resources is None else set(resources)
+        with self._lock:
+            return [
+                snap
+                for snap in self._snapshots.values()
+                if snap.reset_at > now and (wanted is None or snap.resource in wanted)
+            ]
+
+    def is_fresh(self, resources: Iterable[str], max_age_seconds: float = _SNAPSHOT_MAX_AGE_SECONDS) -> bool:
+        now = time.time()
+        with self._lock:
+            for resource in resources:
+                snap = self._snapshots.get(resource)
+                if snap is None or snap.reset_at <= now or now - snap.observed_at > max_age_seconds:
+                    return False
+        return True
+
+
+def plan_poll_interval(
+    snapshots: list[RateLimitSnapshot],
+    *,
+    calls_per_cycle: float,
+    peers: int,
+    min_interval: int,
+    max_interval: int,
+    now: float | None = None,
+) -> PollPlan:
+    now = time.time() if now is None else now
+    calls_per_cycle = max(1.0, calls_per_cycle)
+    peers = max(1, peers)
+    plan = PollPlan(min_interval, None, None, None)
+    for snap in snapshots:
+        reset_in = max(1.0, snap.reset_at - now)
+        budget = snap.remaining - snap.limit * _RESERVE_FRACTION
+        cycles = budget / peers / calls_per_cycle
+        if cycles < 1:
+            interval = math.ceil(reset_in)
+        else:
+            interval = min(max_interval, math.ceil(reset_in / cycles))
+        interval = max(min_interval, interval)
+        if plan.resource is None or interval > plan.interval_seconds:
+            plan = PollPlan(interval, snap.resource, snap.remaining, int(reset_in))
+    return plan
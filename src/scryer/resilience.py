@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+GH_OPERATIONS = ("list", "view", "pr", "comment")
+
+_TRANSIENT_STDERR = re.compile(
+    r"HTTP (?:429|5\d\d)|secondary rate limit|abuse detection|connection reset|connection refused"
+    r"|unexpected EOF|i/o timeout|TLS handshake timeout|timed out|network error",
+    re.IGNORECASE,
+)
+_SECONDARY_RATE_LIMIT = re.compile(r"secondary rate limit|abuse detection|HTTP 429", re.IGNORECASE)
+_PERMANENT_ERROR = re.compile(
+    r"No commits between|already exists|Validation Failed|HTTP 422|Unprocessable Entity",
+    re.IGNORECASE,
+)
+
+
+@dataclass(slots=True)
+class ResiliencePolicy:
+    retry_attempts: int = 3
+    base_delay_seconds: float = 0.5
+    max_delay_seconds: float = 30.0
+    breaker_threshold: int = 5
+    breaker_reset_seconds: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * (2**attempt))
+        return random.uniform(0.0, ceiling)
+
+
+def is_transient(exit_code: int, stdout: str, stderr: str) -> bool:
+    if exit_code == 429 or 500 <= exit_code <= 599:
+        return True
+    return bool(_TRANSIENT_STDERR.search(stderr) or _SECONDARY_RATE_LIMIT.search(stdout))
+
+
+def is_permanent(exit_code: int, stdout: str, stderr: str) -> bool:
+    return exit_code == 422 or bool(_PERMANENT_ERROR.search(stderr) or _PERMANENT_ERROR.search(stdout))
+
+
+def is_secondary_rate_limit(exit_code: int, stdout: str, stderr: str) -> bool:
+    return exit_code == 429 or bool(
+        _SECONDARY_RATE_LIMIT.search(stderr) or _SECONDARY_RATE_LIMIT.search(stdout)
+    )
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, threshold: int, reset_seconds: float):
+        self.name = name
+        self.threshold = max(1, threshold)
+        self.reset_seconds = max(0.0, reset_seconds)
+        self.log = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            was_open = self._opened_at is not None
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+        if was_open:
+            self.log.info("gh circuit closed op=%s", self.name)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None and not self._probing:
+                return
+            if self._probing or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+                failures = self._failures
+            else:
+                return
+        self.log.warning(
+            "gh circuit opened op=%s failures=%s reset_seconds=%s",
+            self.name,
+            failures,
+            self.reset_seconds,
+        )
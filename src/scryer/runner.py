@@ -2,20 +2,37 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import shutil
+import signal
 import subprocess
+import sys
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import IO, Any
 
+from .cassette import Cassette, run_command
 from .config import Config
-from .models import RunnerResult
+from .models import RunMetrics, RunnerResult
 
 
 class RunnerError(RuntimeError):
     pass
 
 
+class RunCancelled(RuntimeError):
+    def __init__(self, stdout: str, stderr: str):
+        super().__init__("codex run cancelled")
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+def git_failure(cmd: list[str], returncode: int, stderr: str) -> RunnerError:
+    return RunnerError(f"Command failed ({returncode}): {' '.join(cmd)}\n{stderr}")
+
+
 def _utc_now_compact() -> str:
     return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
@@ -24,6 +41,51 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
+def _finish_stage(metrics: RunMetrics, stage: str, started: float) -> float:
+    now = time.monotonic()
+    metrics.stage_seconds[stage] = round(now - started, 3)
+    return now
+
+
+def _reap(proc: subprocess.Popen[str]) -> Any:
+    # Reap with wait4 ourselves so the child's rusage is not lost to Popen.wait.
+    if not hasattr(os, "wait4"):
+        proc.wait()
+        return None
+    try:
+        _, status, rusage = os.wait4(proc.pid, 0)
+    except ChildProcessError:
+        proc.wait()
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+def _feed(stream: IO[str], text: str) -> None:
+    try:
+        stream.write(text)
+    except BrokenPipeError:
+        pass
+    finally:
+        try:
+            stream.close()
+        except BrokenPipeError:
+            pass
+
+
+def _drain(stream: IO[str], chunks: list[str]) -> None:
+    chunks.append(stream.read())
+    stream.close()
+
+
+def _record_rusage(metrics: RunMetrics, rusage: Any) -> None:
+    if rusage is None:
+        return
+    metrics.cpu_user_seconds = round(rusage.ru_utime, 3)
+    metrics.cpu_system_seconds = round(rusage.ru_stime, 3)
+    metrics.peak_rss_kb = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+
+
 def _short_title(title: str, max_len: int = 72) -> str:
     clean = " ".join(title.split())
     if len(clean) <= max_len:
@@ -33,13 +95,15 @@ def _short_title(title: str, max_len: int = 72) -> str:
 
 class CodexRunner:
     _HEARTBEAT_SECONDS = 20
+    _CANCEL_CHECK_SECONDS = 2
 
     def __init__(self, config: Config, repo_root: Path):
         self.config = config
         self.repo_root = repo_root
         self.log = logging.getLogger(__name__)
+        self.cassette: Cassette | None = None
 
-    def run(self, issue: dict[str, object]) -> RunnerResult:
+    def run(self, issue: dict[str, object], cancel: threading.Event | None = None) -> RunnerResult:
         issue_id = int(issue["number"])
         branch = f"{self.config.branch_prefix}/issue-{issue_id}"
         worktree_path = self.config.worktrees_dir / f"issue-{issue_id}"
@@ -56,6 +120,8 @@ class CodexRunner:
         prompt_path.write_text(prompt_text, encoding="utf-8")
 
         started_at = _utc_now_iso()
+        metrics = RunMetrics(started_at=started_at)
+        run_started = stage_started = time.monotonic()
         exit_code: int | None = None
         status = "failed"
         error: str | None = None
@@ -69,6 +135,7 @@ class CodexRunner:
                 ["worktree", "add", "-B", branch, str(worktree_path), self.config.base_branch],
                 cwd=self.repo_root,
             )
+            stage_started = _finish_stage(metrics, "worktree", stage_started)
             self.log.info(
                 "prepared worktree issue=%s branch=%s path=%s base=%s",
                 issue_id,
@@ -85,14 +152,17 @@ class CodexRunner:
                 run_dir,
                 " ".join(cmd),
             )
-            proc, elapsed_seconds = self._run_codex_with_heartbeat(
+            proc, elapsed_seconds = self._run_codex(
                 cmd,
                 prompt_text=prompt_text,
                 issue_id=issue_id,
                 run_dir=run_dir,
                 cwd=worktree_path,
                 timeout_seconds=self.config.codex_timeout_seconds,
+                cancel=cancel,
+                metrics=metrics,
             )
+            stage_started = _finish_stage(metrics, "codex", stage_started)
             codex_stdout = proc.stdout or ""
             codex_stderr = proc.stderr or ""
             exit_code = proc.returncode
@@ -120,10 +190,13 @@ class CodexRunner:
                         cwd=worktree_path,
                     )
                     head_sha = self._git_output(["rev-parse", "HEAD"], cwd=worktree_path).strip()
+                    stage_started = _finish_stage(metrics, "commit", stage_started)
                     self._git(["push", "-u", "origin", branch], cwd=worktree_path)
+                    stage_started = _finish_stage(metrics, "push", stage_started)
                     status = "pushed"
                     self.log.info("pushed branch issue=%s branch=%s head_sha=%s", issue_id, branch, head_sha)
         except subprocess.TimeoutExpired as exc:
+            stage_started = _finish_stage(metrics, "codex", stage_started)
             codex_stdout = (exc.stdout or "") if isinstance(exc.stdout, str) else (exc.stdout or b"").decode("utf-8", errors="replace")
             codex_stderr = (exc.stderr or "") if isinstance(exc.stderr, str) else (exc.stderr or b"").decode("utf-8", errors="replace")
             status = "timeout"
@@ -133,6 +206,13 @@ class CodexRunner:
                 issue_id,
                 self.config.codex_timeout_seconds,
             )
+        except RunCancelled as exc:
+            stage_started = _finish_stage(metrics, "codex", stage_started)
+            codex_stdout = exc.stdout
+            codex_stderr = exc.stderr
+            status = "cancelled"
+            error = "issue closed or no longer eligible"
+            self.log.warning("codex cancelled issue=%s", issue_id)
         except Exception as exc:
             status = "failed"
             error = str(exc)
@@ -165,6 +245,9 @@ class CodexRunner:
             keep_worktree = self.config.keep_worktree_on_failure and status in {"failed", "timeout"}
             if not keep_worktree:
                 self._cleanup_worktree(worktree_path)
+            _finish_stage(metrics, "finalize", stage_started)
+            metrics.finished_at = _utc_now_iso()
+            metrics.duration_seconds = round(time.monotonic() - run_started, 3)
             self.log.info(
                 "run complete issue=%s status=%s run_dir=%s summary=%s",
                 issue_id,
@@ -180,6 +263,7 @@ class CodexRunner:
             head_sha=head_sha,
             error=error,
             exit_code=exit_code,
+            metrics=metrics,
         )
 
     def _ensure_clean_worktree(self, worktree_path: Path, branch: str) -> None:
@@ -255,6 +339,46 @@ class CodexRunner:
             sections.append("")
         return sections
 
+    def _run_codex(
+        self,
+        cmd: list[str],
+        prompt_text: str,
+        issue_id: int,
+        run_dir: Path,
+        cwd: Path,
+        timeout_seconds: int,
+        cancel: threading.Event | None = None,
+        metrics: RunMetrics | None = None,
+    ) -> tuple[subprocess.CompletedProcess[str], int]:
+        if self.cassette is None:
+            return self._run_codex_with_heartbeat(
+                cmd,
+                prompt_text=prompt_text,
+                issue_id=issue_id,
+                run_dir=run_dir,
+                cwd=cwd,
+                timeout_seconds=timeout_seconds,
+                cancel=cancel,
+                metrics=metrics,
+            )
+        started = time.monotonic()
+        proc = self.cassette.run(
+            "codex",
+            cmd,
+            cwd,
+            lambda: self._run_codex_with_heartbeat(
+                cmd,
+                prompt_text=prompt_text,
+                issue_id=issue_id,
+                run_dir=run_dir,
+                cwd=cwd,
+                timeout_seconds=timeout_seconds,
+                cancel=cancel,
+                metrics=metrics,
+            )[0],
+        )
+        return proc, int(time.monotonic() - started)
+
     def _run_codex_with_heartbeat(
         self,
         cmd: list[str],
@@ -263,9 +387,11 @@ class CodexRunner:
         run_dir: Path,
         cwd: Path,
         timeout_seconds: int,
+        cancel: threading.Event | None = None,
+        metrics: RunMetrics | None = None,
     ) -> tuple[subprocess.CompletedProcess[str], int]:
         started = time.monotonic()
-        input_text: str | None = prompt_text
+        last_heartbeat = started
         proc = subprocess.Popen(
             cmd,
             cwd=cwd,
@@ -274,87 +400,94 @@ class CodexRunner:
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
         )
-        try:
-            while True:
-                elapsed = time.monotonic() - started
-                remaining = timeout_seconds - elapsed
-                if remaining <= 0:
-                    proc.kill()
-                    stdout, stderr = proc.communicate()
-                    raise subprocess.TimeoutExpired(
-                        cmd=cmd,
-                        timeout=timeout_seconds,
-                        output=stdout,
-                        stderr=stderr,
-                    )
+        stdout_chunks: list[str] = []
+        stderr_chunks: list[str] = []
+        io_threads = [
+            threading.Thread(target=_feed, args=(proc.stdin, prompt_text), daemon=True),
+            threading.Thread(target=_drain, args=(proc.stdout, stdout_chunks), daemon=True),
+            threading.Thread(target=_drain, args=(proc.stderr, stderr_chunks), daemon=True),
+        ]
+        for thread in io_threads:
+            thread.start()
+        rusage: list[Any] = []
+        exited = threading.Event()
+
+        def reap() -> None:
+            try:
+                rusage.append(_reap(proc))
+            finally:
+                exited.set()
+
+        threading.Thread(target=reap, name=f"codex-reaper-{issue_id}", daemon=True).start()
+
+        stopped: str | None = None
+        while True:
+            remaining = timeout_seconds - (time.monotonic() - started)
+            if remaining <= 0:
+                stopped = "timeout"
+            elif cancel is not None and cancel.is_set():
+                stopped = "cancel"
+            if stopped is not None:
+                # proc.kill() would poll and could reap the child before wait4 does.
+                if not exited.is_set():
+                    try:
+                        os.kill(proc.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                break
+
+            check_seconds = self._HEARTBEAT_SECONDS if cancel is None else self._CANCEL_CHECK_SECONDS
+            if exited.wait(min(check_seconds, max(1.0, remaining))):
+                break
+            if time.monotonic() - last_heartbeat < self._HEARTBEAT_SECONDS:
+                continue
+            last_heartbeat = time.monotonic()
+            self.log.info(
+                "codex still running issue=%s elapsed_seconds=%s run_dir=%s",
+                issue_id,
+                int(time.monotonic() - started),
+                run_dir,
+            )
 
-                wait_seconds = min(self._HEARTBEAT_SECONDS, max(1.0, remaining))
-                try:
-                    stdout, stderr = proc.communicate(input=input_text, timeout=wait_seconds)
-                    done_elapsed = int(time.monotonic() - started)
-                    completed = subprocess.CompletedProcess(
-                        args=cmd,
-                        returncode=proc.returncode,
-                        stdout=stdout or "",
-                        stderr=stderr or "",
-                    )
-                    return completed, done_elapsed
-                except subprocess.TimeoutExpired:
-                    input_text = None
-                    self.log.info(
-                        "codex still running issue=%s elapsed_seconds=%s run_dir=%s",
-                        issue_id,
-                        int(time.monotonic() - started),
-                        run_dir,
-                    )
-        finally:
-            if proc.stdin and not proc.stdin.closed:
-                proc.stdin.close()
+        exited.wait()
+        for thread in io_threads:
+            thread.join()
+        if metrics is not None and rusage:
+            _record_rusage(metrics, rusage[0])
+        stdout = "".join(stdout_chunks)
+        stderr = "".join(stderr_chunks)
+        if stopped == "timeout":
+            raise subprocess.TimeoutExpired(cmd=cmd, timeout=timeout_seconds, output=stdout, stderr=stderr)
+        if stopped == "cancel":
+            raise RunCancelled(stdout, stderr)
+        completed = subprocess.CompletedProcess(
+            args=cmd,
+            returncode=proc.returncode,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        return completed, int(time.monotonic() - started)
 
     def _write_diff(self, worktree_path: Path, diff_path: Path) -> None:
         if not worktree_path.exists():
             diff_path.write_text("", encoding="utf-8")
             return
-        proc = subprocess.run(
-            ["git", "show", "--patch", "--stat", "HEAD"],
-            cwd=worktree_path,
-            text=True,
-            capture_output=True,
-            check=False,
-        )
+        proc = run_command("git", ["git", "show", "--patch", "--stat", "HEAD"], worktree_path, self.cassette)
         if proc.returncode == 0 and proc.stdout:
             diff_path.write_text(proc.stdout, encoding="utf-8")
             return
-        fallback = subprocess.run(
-            ["git", "diff", "--patch", "--stat"],
-            cwd=worktree_path,
-            text=True,
-            capture_output=True,
-            check=False,
-        )
+        fallback = run_command("git", ["git", "diff", "--patch", "--stat"], worktree_path, self.cassette)
         diff_path.write_text(fallback.stdout or "", encoding="utf-8")
 
     def _git(self, args: list[str], cwd: Path) -> subprocess.CompletedProcess[str]:
         cmd = ["git", *args]
-        proc = subprocess.run(
-            cmd,
-            cwd=cwd,
-            text=True,
-            capture_output=True,
-            check=False,
-        )
+        proc = run_command("git", cmd, cwd, self.cassette)
         if proc.returncode != 0:
-            raise RunnerError(f"Command failed ({proc.returncode}): {' '.join(cmd)}\n{proc.stderr}")
+            raise git_failure(cmd, proc.returncode, proc.stderr)
         return proc
 
     def _git_output(self, args: list[str], cwd: Path) -> str:
         return self._git(args, cwd).stdout or ""
 
     def _git_ignore_error(self, args: list[str], cwd: Path) -> None:
-        subprocess.run(
-            ["git", *args],
-            cwd=cwd,
-            text=True,
-            capture_output=True,
-            check=False,
-        )
+        run_command("git", ["git", *args], cwd, self.cassette)
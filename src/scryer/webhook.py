@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from .config import Config
+from .db import Database
+
+_MAX_PAYLOAD_BYTES = 25 * 1024 * 1024
+
+
+def parse_listen_address(value: str) -> tuple[str, int]:
+    host, sep, port = value.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Expected host:port for webhook listen address, got {value!r}")
+    return host.strip("[]") or "127.0.0.1", int(port)
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+
+class WebhookServer:
+    def __init__(
+        self,
+        config: Config,
+        host: str,
+        port: int,
+        secret: str,
+        on_change: Callable[[bool], None],
+        repo_full_name: str | None = None,
+    ):
+        if not secret:
+            raise ValueError("webhook_secret must be set to run the webhook listener")
+        self.config = config
+        self.secret = secret
+        self.on_change = on_change
+        self.repo_full_name = repo_full_name.lower() if repo_full_name else None
+        self.log = logging.getLogger(__name__)
+        self._db = Database(
+            config.db_path,
+            repo_namespace=config.repo_namespace,
+            busy_timeout_seconds=config.db_busy_timeout_seconds,
+        )
+        self._db_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._httpd.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="scryer-webhook",
+            daemon=True,
+        )
+        self._thread.start()
+        host, port = self.address
+        self.log.info("webhook listener started host=%s port=%s", host, port)
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._db_lock:
+            self._db.close()
+        self.log.info("webhook listener stopped")
+
+    def handle_event(self, event: str, payload: dict[str, Any]) -> str:
+        if event == "ping":
+            return "pong"
+        repository = payload.get("repository")
+        if self.repo_full_name and isinstance(repository, dict):
+            full_name = str(repository.get("full_name", "")).lower()
+            if full_name and full_name != self.repo_full_name:
+                self.log.warning("webhook ignored event=%s repository=%s", event, full_name)
+                return "ignored"
+        if event == "label":
+            self.log.info("webhook label event action=%s", payload.get("action"))
+            self.on_change(True)
+            return "reconcile"
+        if event != "issues":
+            return "ignored"
+
+        issue = payload.get("issue")
+        if not isinstance(issue, dict) or "pull_request" in issue or issue.get("number") is None:
+            return "ignored"
+        labels = [
+            str(label["name"])
+            for label in issue.get("labels", [])
+            if isinstance(label, dict) and label.get("name")
+        ]
+        action = payload.get("action")
+        eligible = (
+            str(issue.get("state", "")).lower() == "open"
+            and self.config.trigger_label in labels
+            and not set(labels) & set(self.config.skip_labels)
+        )
+        cancelled: list[int] = []
+        with self._db_lock:
+            if eligible:
+                self._db.upsert_polled_issues(
+                    [
+                        {
+                            "id": int(issue["number"]),
+                            "title": str(issue.get("title", "")),
+                            "body": issue.get("body"),
+                            "url": issue.get("html_url"),
+                            "labels": labels,
+                            "updated_at": issue.get("updated_at"),
+                        }
+                    ]
+                )
+            else:
+                cancelled = self._db.cancel_issues([int(issue["number"])], "issue closed or no longer eligible")
+        self.log.info(
+            "webhook issue event action=%s issue=%s eligible=%s cancelled=%s",
+            action,
+            issue.get("number"),
+            eligible,
+            bool(cancelled),
+        )
+        self.on_change(False)
+        if eligible:
+            return "upserted"
+        return "cancelled" if cancelled else "noted"
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                server.log.debug("webhook http " + format, *args)
+
+            def _reply(self, code: int, message: str) -> None:
+                body = json.dumps({"result": message}).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                try:
+                    length = int(self.headers.get("Content-Length", "0"))
+                except ValueError:
+                    self._reply(400, "invalid content length")
+                    return
+                if length <= 0 or length > _MAX_PAYLOAD_BYTES:
+                    self._reply(413 if length > 0 else 400, "invalid payload size")
+                    return
+                body = self.rfile.read(length)
+                if not verify_signature(server.secret, body, self.headers.get("X-Hub-Signature-256")):
+                    server.log.warning("webhook rejected invalid signature from=%s", self.client_address[0])
+                    self._reply(401, "invalid signature")
+                    return
+                try:
+                    payload = json.loads(body)
+                except json.JSONDecodeError:
+                    self._reply(400, "invalid json")
+                    return
+                if not isinstance(payload, dict):
+                    self._reply(400, "invalid json")
+                    return
+                event = self.headers.get("X-GitHub-Event", "")
+                try:
+                    result = server.handle_event(event, payload)
+                except Exception:
+                    server.log.exception("webhook handling failed event=%s", event)
+                    self._reply(500, "error")
+                    return
+                self._reply(202 if result != "pong" else 200, result)
+
+        return _Handler
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from scryer.db import Database, claim_batch_sql
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    database = Database(tmp_path / "scryer.db", repo_namespace="acme/widgets")
+    database.upsert_polled_issues(
+        [
+            {
+                "id": issue_id,
+                "title": f"Issue {issue_id}",
+                "url": None,
+                "labels": ["enhancement", "blocked"] if issue_id % 7 == 0 else ["enhancement"],
+                "updated_at": f"2026-01-{1 + issue_id % 28:02d}T00:00:00Z" if issue_id % 10 else None,
+            }
+            for issue_id in range(1, 501)
+        ]
+    )
+    database.conn.execute("ANALYZE")
+    try:
+        yield database
+    finally:
+        database.close()
+
+
+@pytest.mark.parametrize("skip_labels", [(), ("blocked",), ("blocked", "wontfix")])
+def test_claim_uses_partial_index_without_sorting(db: Database, skip_labels: tuple[str, ...]) -> None:
+    params = ("", "", "worker", db.repo_namespace, 2, *skip_labels, 4)
+    plan = [
+        str(row["detail"])
+        for row in db.conn.execute(f"EXPLAIN QUERY PLAN {claim_batch_sql(len(skip_labels))}", params)
+    ]
+    assert any("idx_issues_repo_pending_claim" in detail for detail in plan), plan
+    assert not any("TEMP B-TREE" in detail for detail in plan), plan
+
+
+def test_claim_batch_respects_order_and_skip_labels(db: Database) -> None:
+    claimed = db.claim_pending_batch(5, "worker", max_attempts=2, lease_seconds=60, skip_labels=["blocked"])
+    # Rows without updated_at fall back to created_at (now), so they sort first, by id.
+    assert [issue.id for issue in claimed] == [10, 20, 30, 40, 50]
+    claimed = db.claim_pending_batch(5, "worker", max_attempts=2, lease_seconds=60, skip_labels=["blocked"])
+    assert 70 not in [issue.id for issue in claimed]
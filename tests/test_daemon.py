@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from scryer.config import Config
+from scryer.daemon import DaemonService
+from scryer.db import Database
+from scryer.gh import GhError
+
+
+class _SlowGh:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.threads: list[str] = []
+
+    def view_issue(self, issue_id: int) -> dict[str, Any]:
+        self.threads.append(threading.current_thread().name)
+        self.release.wait(timeout=10)
+        raise GhError(["issue", "view", str(issue_id)], 1, "", "HTTP 502")
+
+    def view_issues(self, issue_ids: list[int]) -> dict[int, dict[str, Any]]:
+        raise AssertionError("dispatch must not fetch issue details")
+
+
+class _Outbox:
+    def drain(self) -> int:
+        raise AssertionError("dispatch must not drain the outbox")
+
+
+def test_dispatch_does_not_wait_on_github(tmp_path: Path) -> None:
+    config = Config(workdir=tmp_path, db_path=tmp_path / "scryer.db", max_concurrent=2)
+    db = Database(config.db_path, repo_namespace=config.repo_namespace)
+    gh = _SlowGh()
+    service = DaemonService(config, db, gh, None, None, None, _Outbox())
+    db.upsert_polled_issues(
+        [{"id": n, "title": f"Issue {n}", "url": None, "labels": ["enhancement"], "updated_at": None} for n in (1, 2)]
+    )
+    try:
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-worker") as executor:
+            service.prepare_dispatch()
+            submitted = service.submit_claims(executor, 2, 0)
+            assert len(submitted) == 2
+            assert not any(future.done() for future in submitted)
+            gh.release.set()
+            results = [future.result(timeout=10) for future in submitted]
+        assert [result.status for result in results] == ["failed", "failed"]
+        assert gh.threads and all(name.startswith("test-worker") for name in gh.threads)
+    finally:
+        gh.release.set()
+        db.close()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from scryer.db import Database
+from scryer.gh import GhError
+from scryer.gh_http import HttpGhClient
+
+ISSUES_PATH = "/repos/acme/widgets/issues"
+RESET_AT = int(time.time()) + 3600
+
+
+def _issue(number: int, labels: list[str]) -> dict[str, object]:
+    return {
+        "number": number,
+        "title": f"Issue {number}",
+        "body": "body",
+        "html_url": f"https://github.com/acme/widgets/issues/{number}",
+        "labels": [{"name": label} for label in labels],
+        "state": "open",
+        "created_at": "2026-01-01T00:00:00Z",
+        "updated_at": "2026-01-02T00:00:00Z",
+    }
+
+
+PAGES = {
+    "1": [_issue(1, ["enhancement"]), _issue(2, ["enhancement", "blocked"])],
+    "2": [_issue(3, ["enhancement"])],
+}
+
+
+class _StubGitHub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    requests: list[tuple[str, dict[str, str]]] = []
+
+    def setup(self) -> None:
+        super().setup()
+        type(self).connections += 1
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        type(self).requests.append((self.path, {key.lower(): value for key, value in self.headers.items()}))
+        if url.path == "/rate_limit":
+            resources = {
+                name: {"limit": 5000, "remaining": 4000, "reset": RESET_AT, "used": 1000}
+                for name in ("core", "graphql", "search")
+            }
+            self._send(200, json.dumps({"resources": resources}).encode("utf-8"))
+            return
+        if url.path != ISSUES_PATH:
+            self._send(404, b'{"message": "Not Found"}')
+            return
+        page = parse_qs(url.query).get("page", ["1"])[0]
+        etag = f'"issues-{page}"'
+        headers = {
+            "ETag": etag,
+            "X-RateLimit-Resource": "core",
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4990" if page == "1" else "4989",
+            "X-RateLimit-Reset": str(RESET_AT),
+        }
+        if page == "1":
+            port = self.server.server_address[1]
+            headers["Link"] = (
+                f'<http://127.0.0.1:{port}{ISSUES_PATH}?state=open&per_page=2&page=2>; rel="next", '
+                f'<http://127.0.0.1:{port}{ISSUES_PATH}?state=open&per_page=2&page=2>; rel="last"'
+            )
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", headers)
+            return
+        self._send(200, json.dumps(PAGES[page]).encode("utf-8"), headers)
+
+    def do_POST(self) -> None:
+        type(self).requests.append((self.path, {key.lower(): value for key, value in self.headers.items()}))
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        # Accept the request, then drop the connection before answering.
+        self.close_connection = True
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_server():
+    _StubGitHub.connections = 0
+    _StubGitHub.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubGitHub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(stub_server, tmp_path: Path):
+    cache = Database(tmp_path / "cache.db", repo_namespace="acme/widgets")
+    gh = HttpGhClient(
+        repo_root=tmp_path,
+        owner="acme",
+        repo="widgets",
+        token="test-token",
+        api_url=f"http://127.0.0.1:{stub_server.server_address[1]}",
+        pool_size=1,
+        cache=cache,
+    )
+    try:
+        yield gh, cache
+    finally:
+        gh.close()
+
+
+def _list_all(gh: HttpGhClient) -> list[int]:
+    pages = gh.iter_open_issue_pages("enhancement", page_size=2, skip_labels=["blocked"])
+    return [int(issue["number"]) for page in pages for issue in page]
+
+
+def test_pagination_follows_link_header_over_one_connection(client) -> None:
+    gh, _ = client
+    assert _list_all(gh) == [1, 3]
+    paths = [path for path, _ in _StubGitHub.requests]
+    assert len(paths) == 2
+    assert "page=2" in paths[1]
+    assert _StubGitHub.connections == 1
+    assert all(headers["authorization"] == "Bearer test-token" for _, headers in _StubGitHub.requests)
+
+
+def test_etag_revalidation_serves_cached_body(client) -> None:
+    gh, cache = client
+    assert _list_all(gh) == [1, 3]
+    calls = gh.rate_limit.calls
+    assert _list_all(gh) == [1, 3]
+    revalidated = _StubGitHub.requests[2:]
+    assert [headers.get("if-none-match") for _, headers in revalidated] == ['"issues-1"', '"issues-2"']
+    # Link headers are replayed from the cache, so pagination still reaches page 2.
+    assert gh.rate_limit.calls == calls
+    assert cache.get_http_cache_stats()["hits"] == 2
+    assert _StubGitHub.connections == 1
+
+
+def test_rate_limit_headers_update_tracker(client) -> None:
+    gh, _ = client
+    _list_all(gh)
+    snapshots = {snap.resource: snap for snap in gh.rate_limit.snapshots()}
+    assert set(snapshots) == {"core"}
+    assert snapshots["core"].limit == 5000
+    assert snapshots["core"].remaining == 4989
+    assert snapshots["core"].reset_at == RESET_AT
+
+
+def test_rate_limit_refresh_only_fills_missing_resources(client) -> None:
+    gh, _ = client
+    _list_all(gh)
+    gh.refresh_rate_limit()
+    gh.refresh_rate_limit()
+    paths = [urlsplit(path).path for path, _ in _StubGitHub.requests]
+    assert paths.count("/rate_limit") == 1
+    snapshots = gh.rate_limit.snapshots(gh.rate_limit_resources)
+    assert {snap.resource for snap in snapshots} == {"core", "graphql"}
+
+
+def test_dropped_post_is_not_replayed(client) -> None:
+    gh, _ = client
+    _list_all(gh)
+    with pytest.raises(GhError) as excinfo:
+        gh.comment_issue(1, "hello")
+    assert excinfo.value.network
+    posts = [path for path, _ in _StubGitHub.requests if path.endswith("/comments")]
+    assert posts == ["/repos/acme/widgets/issues/1/comments"]
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from scryer.config import Config
+from scryer.db import Database
+from scryer.poller import Poller
+
+ISSUE = {
+    "number": 7,
+    "title": "Add CSV export",
+    "url": "https://github.com/acme/widgets/issues/7",
+    "labels": [{"name": "enhancement"}],
+    "updatedAt": "2026-02-01T00:00:00Z",
+}
+
+
+class _FakeGh:
+    listing_cap = None
+
+    def __init__(self) -> None:
+        self.open_issues: list[dict[str, Any]] = []
+        self.details: dict[int, dict[str, Any]] = {}
+
+    def iter_open_issue_pages(self, *args: Any, **kwargs: Any) -> Iterator[list[dict[str, Any]]]:
+        yield list(self.open_issues)
+
+    def view_issues(self, issue_ids: list[int]) -> dict[int, dict[str, Any]]:
+        return {issue_id: self.details[issue_id] for issue_id in issue_ids if issue_id in self.details}
+
+
+@pytest.fixture
+def db(tmp_path: Path):
+    database = Database(tmp_path / "scryer.db", repo_namespace="acme/widgets")
+    try:
+        yield database
+    finally:
+        database.close()
+
+
+def _poller(db: Database, gh: _FakeGh, tmp_path: Path, full_resync_seconds: int = 0) -> Poller:
+    config = Config(
+        workdir=tmp_path,
+        db_path=db.db_path,
+        repo_namespace=db.repo_namespace,
+        poll_full_resync_seconds=full_resync_seconds,
+    )
+    return Poller(config, db, gh)
+
+
+def test_cancelled_issue_returns_to_pending_when_it_reappears(db: Database, tmp_path: Path) -> None:
+    gh = _FakeGh()
+    poller = _poller(db, gh, tmp_path)
+    gh.open_issues = [ISSUE]
+    poller.poll_and_upsert()
+    assert db.get_issue_statuses([7]) == {7: "pending"}
+
+    gh.open_issues = []
+    poller.poll_and_upsert()
+    assert db.get_issue_statuses([7]) == {7: "cancelled"}
+
+    gh.open_issues = [ISSUE]
+    poller.poll_and_upsert()
+    assert db.get_issue_statuses([7]) == {7: "pending"}
+
+
+def test_reupserting_an_unchanged_cancelled_issue_counts_as_changed(db: Database) -> None:
+    issue = {"id": 7, "title": "Add CSV export", "url": "u", "labels": ["enhancement"], "updated_at": "t"}
+    db.upsert_polled_issues([issue])
+    db.cancel_missing_issues([], "gone")
+    stats = db.upsert_polled_issues([issue])
+    assert (stats.inserted, stats.changed, stats.unchanged) == (0, 1, 0)
+    assert db.get_issue_statuses([7]) == {7: "pending"}
+
+
+def test_running_issue_missing_from_details_is_not_cancelled(db: Database, tmp_path: Path) -> None:
+    gh = _FakeGh()
+    gh.open_issues = [ISSUE]
+    _poller(db, gh, tmp_path).poll_and_upsert()
+    assert db.claim_next_pending("worker", max_attempts=2, lease_seconds=60) is not None
+
+    # An incremental poll checks running issues through view_issues; no node
+    # for issue 7 must not be read as "closed".
+    _poller(db, gh, tmp_path, full_resync_seconds=3600).poll_and_upsert()
+    assert db.get_issue_statuses([7]) == {7: "running"}
+
+    gh.details[7] = {**ISSUE, "state": "CLOSED"}
+    _poller(db, gh, tmp_path, full_resync_seconds=3600).poll_and_upsert()
+    assert db.get_issue_statuses([7]) == {7: "cancelled"}
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import http.client
+import json
+from pathlib import Path
+
+import pytest
+
+from scryer.config import Config
+from scryer.db import Database
+from scryer.webhook import WebhookServer
+
+FIXTURES = Path(__file__).parent / "fixtures" / "webhook"
+SECRET = "webhook-test-secret"
+
+
+def _sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def webhook(tmp_path: Path):
+    config = Config(workdir=tmp_path, db_path=tmp_path / "scryer.db", repo_namespace="acme/widgets")
+    wakes: list[bool] = []
+    server = WebhookServer(config, "127.0.0.1", 0, SECRET, wakes.append, repo_full_name="acme/widgets")
+    server.start()
+    db = Database(config.db_path, repo_namespace=config.repo_namespace)
+    try:
+        yield server, db, wakes
+    finally:
+        db.close()
+        server.stop()
+
+
+def _post(server: WebhookServer, event: str, fixture: str, signature: str | None = None) -> tuple[int, str]:
+    body = (FIXTURES / fixture).read_bytes()
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-Hub-Signature-256": signature if signature is not None else _sign(body),
+    }
+    conn = http.client.HTTPConnection(*server.address, timeout=5)
+    try:
+        conn.request("POST", "/", body=body, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read())["result"]
+    finally:
+        conn.close()
+
+
+def test_labeled_issue_is_upserted_and_wakes_daemon(webhook) -> None:
+    server, db, wakes = webhook
+    assert _post(server, "issues", "issues_labeled.json") == (202, "upserted")
+    assert db.get_issue_statuses([42]) == {42: "pending"}
+    assert wakes == [False]
+
+
+def test_closed_issue_is_cancelled(webhook) -> None:
+    server, db, wakes = webhook
+    _post(server, "issues", "issues_labeled.json")
+    assert _post(server, "issues", "issues_closed.json") == (202, "cancelled")
+    assert db.get_issue_statuses([42]) == {42: "cancelled"}
+    assert wakes == [False, False]
+
+
+def test_label_event_requests_reconcile(webhook) -> None:
+    server, _, wakes = webhook
+    assert _post(server, "label", "label_edited.json") == (202, "reconcile")
+    assert wakes == [True]
+
+
+@pytest.mark.parametrize(
+    "signature",
+    ["", "sha1=deadbeef", _sign(b"{}"), _sign((FIXTURES / "issues_labeled.json").read_bytes(), "wrong-secret")],
+)
+def test_invalid_signature_is_rejected(webhook, signature: str) -> None:
+    server, db, wakes = webhook
+    assert _post(server, "issues", "issues_labeled.json", signature) == (401, "invalid signature")
+    assert db.get_issue_statuses([42]) == {}
+    assert wakes == []